@@ -0,0 +1,58 @@
+import numpy as np
+
+def keep(arrays, count, mask):
+    """
+    Function for dropping the entries whose mask is False from the first count entries of each array, moving the
+    rest to the front in order, returns how many were kept
+
+    Parameters:
+    arrays: sequence of numpy.ndarray
+    count: int
+    mask: numpy.ndarray of bool, one entry per kept or dropped element
+    """
+    kept = int(mask.sum())
+    for values in arrays:
+        values[:kept] = values[:count][mask]
+    return kept
+
+def bounce_off_walls(x, y, dx, dy, radius, width):
+    """
+    Function for bouncing balls off the side and top walls, changing dx and dy in place
+
+    Balls past a wall are always sent back into the playable area rather than flipped, so a ball pushed into a
+    wall can not get stuck bouncing back and forth behind it. Most balls are nowhere near a wall, so the bounces
+    are only worked out for the few that are
+
+    Parameters:
+    x: numpy.ndarray
+    y: numpy.ndarray
+    dx: numpy.ndarray
+    dy: numpy.ndarray
+    radius: float
+    width: float
+    """
+    walls = np.flatnonzero((x < radius) | (x > width - radius) | (y < radius))
+    if len(walls):
+        wall_x, wall_dx = x[walls], dx[walls]
+        wall_dx = np.where(wall_x < radius, np.abs(wall_dx), wall_dx)
+        dx[walls] = np.where(wall_x > width - radius, -np.abs(wall_dx), wall_dx)
+        dy[walls] = np.where(y[walls] < radius, np.abs(dy[walls]), dy[walls])
+
+def block_sides(dx, dy, ball_edges, block_edges):
+    """
+    Function for the sides of a block each overlapping ball came in through, returns (flip_x, flip_y) masks of the
+    balls to bounce sideways and up or down, both are set for a ball that hit a corner
+
+    A ball came in through a side if, moving towards it, the ball now straddles it
+
+    Parameters:
+    dx: numpy.ndarray
+    dy: numpy.ndarray
+    ball_edges: (left, top, right, bottom) numpy.ndarrays of each ball's bounding box
+    block_edges: (left, top, right, bottom) numpy.ndarrays of the block each ball overlaps
+    """
+    left, top, right, bottom = ball_edges
+    block_left, block_top, block_right, block_bottom = block_edges
+    flip_x = np.where(dx > 0, (right > block_left) & (left < block_left), (left < block_right) & (right > block_right))
+    flip_y = np.where(dy > 0, (bottom > block_top) & (top < block_top), (top < block_bottom) & (bottom > block_bottom))
+    return flip_x, flip_y
@@ -0,0 +1,300 @@
+import importlib.util
+import os
+import sys
+from collections import OrderedDict
+
+def lazy_import(name):
+    """
+    Function for importing a module that is only loaded the first time one of its attributes is used
+
+    A plain import statement of the same module loads it straight away, so modules that should not load it
+    take the lazy module from here instead
+
+    Parameters:
+    name: str
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+pygame = lazy_import("pygame")
+
+# Folder for scaled images stored as raw pixels in the display's format, so later launches skip decoding them
+CACHE_DIR = ".cache"
+
+# Looks a brick can be pre-rendered in
+BRICK_STYLES = ["flat", "bevel", "texture"]
+
+def shade(color, amount):
+    """
+    Function for mixing a colour towards white for a positive amount, or towards black for a negative one
+
+    Parameters:
+    color: (r, g, b)
+    amount: float between -1 and 1
+    """
+    target = 255 if amount > 0 else 0
+    return tuple(round(channel + (target - channel) * abs(amount)) for channel in color[:3])
+
+class BrickAtlas:
+    """
+    Class for bricks pre-rendered once per size and colour in one style, packed in rows on a single surface
+
+    area returns where a brick is on the atlas surface, so any number of bricks can be drawn with one
+    Surface.blits call. The surface is replaced by a taller copy when it runs out of room, and is only
+    created once something is drawn, after the display mode has been set
+
+    Parameters:
+    style: str, one of BRICK_STYLES
+    width: int
+    """
+    def __init__(self, style="flat", width=2048):
+        if style not in BRICK_STYLES:
+            raise ValueError(f"brick style must be one of {BRICK_STYLES}, not {style!r}")
+        self.style = style
+        self.width = width
+        self.surface = None
+        self.areas = {}
+        self.x = 0
+        self.y = 0
+        self.row_height = 0
+
+    def area(self, size, color):
+        """
+        Method for the rect of a brick on the atlas surface, drawing it the first time it is asked for
+
+        Parameters:
+        size: (int, int)
+        color: (r, g, b)
+        """
+        key = (size, color)
+        area = self.areas.get(key)
+        if area is None:
+            area = self.areas[key] = self.place(size)
+            self.draw_brick(area, color)
+        return area
+
+    def place(self, size):
+        """
+        Method for reserving room for a brick, starting a new row or growing the surface when needed
+
+        Parameters:
+        size: (int, int)
+        """
+        width, height = size
+        if self.x + width > self.width:
+            self.x, self.y, self.row_height = 0, self.y + self.row_height, 0
+        self.row_height = max(self.row_height, height)
+        bottom = self.y + self.row_height
+        if self.surface is None or bottom > self.surface.get_height():
+            old = self.surface
+            surface_height = max(bottom, 2 * old.get_height() if old is not None else 64)
+            self.surface = pygame.Surface((self.width, surface_height)).convert()
+            if old is not None:
+                self.surface.blit(old, (0, 0))
+        area = pygame.Rect(self.x, self.y, width, height)
+        self.x += width
+        return area
+
+    def draw_brick(self, area, color):
+        """
+        Method for drawing a brick in the atlas style
+
+        Parameters:
+        area: pygame.Rect
+        color: (r, g, b)
+        """
+        surface = self.surface
+        surface.fill(color, area)
+        if self.style == "bevel":
+            # Lit top and left edges, shaded bottom and right edges
+            edge = max(1, min(area.width, area.height) // 6)
+            inner = area.inflate(-2 * edge, -2 * edge)
+            pygame.draw.polygon(surface, shade(color, 0.45), [area.topleft, area.topright, inner.topright,
+                                                              inner.topleft, inner.bottomleft, area.bottomleft])
+            pygame.draw.polygon(surface, shade(color, -0.4), [area.bottomright, area.bottomleft, inner.bottomleft,
+                                                              inner.bottomright, inner.topright, area.topright])
+            surface.fill(color, inner)
+        elif self.style == "texture":
+            # Darker diagonal hatching inside a dark outline
+            clip = surface.get_clip()
+            surface.set_clip(area)
+            hatch = shade(color, -0.2)
+            for offset in range(-area.height, area.width, 6):
+                pygame.draw.line(surface, hatch, (area.x + offset, area.bottom), (area.x + offset + area.height, area.y))
+            surface.set_clip(clip)
+            pygame.draw.rect(surface, shade(color, -0.5), area, 1)
+
+class AssetCache:
+    """
+    Class for loading every surface once in the display's pixel format and reusing it
+
+    Images are converted when loaded, rendered text is kept in a least-recently-used cache, and the
+    ball's transparency steps are drawn up front so nothing is allocated while the game is running.
+    Scaled opaque images are also kept in cache_dir, keyed by size and display format, and a cache_dir
+    of None turns that off. The display mode has to be set before anything is loaded
+
+    Parameters:
+    max_texts: int
+    cache_dir: str
+    """
+    def __init__(self, max_texts=128, cache_dir=CACHE_DIR):
+        self.max_texts = max_texts
+        self.cache_dir = cache_dir
+        self.images = {}
+        self.fonts = {}
+        self.texts = OrderedDict()
+        self.ball_sprites = {}
+        self.brick_atlases = {}
+
+    def image(self, path, size=None, alpha=False):
+        """
+        Method for loading an image, optionally scaled, converted to the display's pixel format
+
+        Raises pygame.error if the image can not be loaded
+
+        Parameters:
+        path: str
+        size: (int, int)
+        alpha: bool
+        """
+        key = (path, size, alpha)
+        if key not in self.images:
+            cached = self.cache_dir is not None and size is not None and not alpha
+            image = self.load_raw(path, size) if cached else None
+            if image is None:
+                image = pygame.image.load(path)
+                if size is not None:
+                    image = pygame.transform.scale(image, size)
+                image = image.convert_alpha() if alpha else image.convert()
+                if cached:
+                    self.save_raw(path, size, image)
+            self.images[key] = image
+        return self.images[key]
+
+    def raw_path(self, path, size):
+        """
+        Method for the cache file of an image at a size, named after the size and the display's pixel format
+
+        Parameters:
+        path: str
+        size: (int, int)
+        """
+        display = pygame.display.get_surface()
+        masks = "-".join(f"{mask:x}" for mask in display.get_masks())
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f"{name}-{size[0]}x{size[1]}-{display.get_bitsize()}-{masks}.raw")
+
+    def load_raw(self, path, size):
+        """
+        Method for reading a cached image's pixels straight into a display-format surface, returns None if there
+        is no cache file or it is older than the image
+
+        Parameters:
+        path: str
+        size: (int, int)
+        """
+        raw_path = self.raw_path(path, size)
+        try:
+            if os.path.getmtime(raw_path) < os.path.getmtime(path):
+                return None
+            with open(raw_path, "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+        image = pygame.Surface(size, 0, pygame.display.get_surface())
+        pixels = image.get_buffer()
+        if len(data) != pixels.length:
+            return None
+        pixels.write(data)
+        del pixels  # Unlocks the surface
+        return image
+
+    def save_raw(self, path, size, image):
+        """
+        Method for writing an image's pixels to the cache, skipped if the cache folder can not be written
+
+        Parameters:
+        path: str
+        size: (int, int)
+        image: pygame.Surface
+        """
+        raw_path = self.raw_path(path, size)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(raw_path + ".tmp", "wb") as file:
+                file.write(image.get_buffer().raw)
+            os.replace(raw_path + ".tmp", raw_path)
+        except OSError:
+            pass
+
+    def font(self, size):
+        """
+        Method for getting the default font at the given size
+
+        Parameters:
+        size: int
+        """
+        if size not in self.fonts:
+            self.fonts[size] = pygame.font.Font(None, size)
+        return self.fonts[size]
+
+    def text(self, string, size, color):
+        """
+        Method for rendering text, reusing the surface if the same text was rendered recently
+
+        Parameters:
+        string: str
+        size: int
+        color: pygame.Color or (r, g, b)
+        """
+        key = (string, size, tuple(pygame.Color(color)))
+        surface = self.texts.get(key)
+        if surface is None:
+            surface = self.font(size).render(string, True, color).convert_alpha()
+            self.texts[key] = surface
+            if len(self.texts) > self.max_texts:
+                self.texts.popitem(last=False)  # Drop the least recently used text
+        else:
+            self.texts.move_to_end(key)
+        return surface
+
+    def ball(self, radius, alphas):
+        """
+        Method for getting white ball sprites with each of the given transparencies baked into their pixels
+
+        Returns a dictionary from alpha to surface, so changing transparency is a lookup instead of set_alpha
+
+        Parameters:
+        radius: int
+        alphas: iterable of int
+        """
+        if radius not in self.ball_sprites:
+            self.ball_sprites[radius] = {}
+        sprites = self.ball_sprites[radius]
+        for alpha in alphas:
+            if alpha not in sprites:
+                surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+                pygame.draw.circle(surface, (255, 255, 255), (radius, radius), radius)
+                surface.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+                sprites[alpha] = surface.convert_alpha()
+        return sprites
+
+    def brick_atlas(self, style):
+        """
+        Method for getting the shared atlas of bricks in a style
+
+        Parameters:
+        style: str, one of BRICK_STYLES
+        """
+        if style not in self.brick_atlases:
+            self.brick_atlases[style] = BrickAtlas(style)
+        return self.brick_atlases[style]
+
+# Shared cache for the game, filled once the display has been created
+cache = AssetCache()
@@ -0,0 +1,279 @@
+import numpy as np
+from Arrays import block_sides, bounce_off_walls
+from Simulation import HEIGHT, WIDTH, BreakoutSimulation
+
+# Paddle directions as integers, matching the strings used by Paddle.move
+DIRECTIONS = {None: 0, "left": -1, "right": 1}
+
+class BatchSimulation:
+    """
+    Class for stepping many Breakout games at once, with every game's state held in NumPy arrays
+
+    Uses the same paddle, ball and block sizes as BreakoutSimulation, and the same wall, paddle and block bounce rules
+    checked once per tick by overlap rather than by sweeping, which matches the swept result at normal ball speeds.
+    The blocks must sit on a regular lattice with gaps at least as wide as the ball, so that each ball is checked
+    against the one block it can overlap
+
+    Parameters:
+    n_games: int
+    width: int
+    height: int
+    modifier: str
+    seed: int
+    """
+    def __init__(self, n_games, width=WIDTH, height=HEIGHT, modifier=None, seed=None):
+        self.n_games = n_games
+        self.width = width
+        self.height = height
+        self.modifier = modifier
+        self.rng = np.random.default_rng(seed)
+
+        # Take the object sizes from the scalar simulation so both paths stay in step
+        template = BreakoutSimulation(width, height)
+        self.paddle_width = template.paddle_width
+        self.paddle_height = template.paddle_height
+        self.paddle_y = template.paddle.y
+        self.start_paddle_x = template.paddle.x
+        self.start_paddle_speed = template.paddle_speed
+        self.start_ball_speed = template.ball_speed
+        self.radius = template.ball.radius
+
+        # Block positions are shared by every game, only the alive mask differs
+        self.block_width = template.block_grid.width
+        self.block_height = template.block_grid.height
+        blocks = np.array(template.block_grid.blocks, dtype=np.float64)
+        self.block_left = blocks[:, 0]
+        self.block_top = blocks[:, 1]
+        self.block_right = blocks[:, 0] + blocks[:, 2]
+        self.block_bottom = blocks[:, 1] + blocks[:, 3]
+        self.n_blocks = len(blocks)
+        self.blocks_top = self.block_top.min()
+        self.blocks_bottom = self.block_bottom.max()
+
+        # Ball heights that might touch the rows of blocks or the paddles, a pixel wider than needed so the exact
+        # tests on the balls in between decide every edge case
+        self.blocks_low = self.blocks_top - self.radius - 1
+        self.blocks_high = self.blocks_bottom + self.radius + 1
+        self.paddle_low = self.paddle_y - self.radius - 1
+        self.paddle_high = self.paddle_y + self.paddle_height + self.radius + 1
+        self.lost_y = self.height - self.radius - 1
+
+        # The blocks sit on a lattice of slots, one block to a slot, with gaps at least as wide as the ball. So a
+        # ball overlaps at most one block, the one in the slot its bottom right corner is in, and a ball outside the
+        # lattice overlaps none, so any slot will do for it. Empty slots hold index n_blocks, an extra block placed
+        # so that it never overlaps anything
+        lefts, tops = np.unique(self.block_left), np.unique(self.block_top)
+        self.slot_x, self.slot_y = lefts[0], tops[0]
+        self.slot_width = lefts[1] - lefts[0] if len(lefts) > 1 else self.block_width
+        self.slot_height = tops[1] - tops[0] if len(tops) > 1 else self.block_height
+        self.slot_columns, self.slot_rows = len(lefts), len(tops)
+        columns = np.rint((self.block_left - self.slot_x) / self.slot_width).astype(np.intp)
+        rows = np.rint((self.block_top - self.slot_y) / self.slot_height).astype(np.intp)
+        slots = rows * self.slot_columns + columns
+        if (np.any(self.slot_x + columns * self.slot_width != self.block_left)
+                or np.any(self.slot_y + rows * self.slot_height != self.block_top)
+                or len(np.unique(slots)) != self.n_blocks or self.block_width + 2 * self.radius > self.slot_width
+                or self.block_height + 2 * self.radius > self.slot_height):
+            raise ValueError("blocks must sit on a regular lattice with gaps at least as wide as the ball")
+        self.slot_block = np.full(self.slot_columns * self.slot_rows, self.n_blocks)
+        self.slot_block[slots] = np.arange(self.n_blocks)
+        self.candidate_left = np.append(self.block_left, np.inf)
+        self.candidate_top = np.append(self.block_top, np.inf)
+        self.candidate_right = np.append(self.block_right, -np.inf)
+        self.candidate_bottom = np.append(self.block_bottom, -np.inf)
+
+        self.ball_x = np.zeros(n_games)
+        self.ball_y = np.zeros(n_games)
+        self.ball_dx = np.zeros(n_games)
+        self.ball_dy = np.zeros(n_games)
+        self.ball_speed = np.zeros(n_games)
+        self.paddle_x = np.zeros(n_games)
+        self.paddle_speed = np.zeros(n_games)
+        self.block_alive = np.zeros((n_games, self.n_blocks), dtype=bool)
+        self.score = np.zeros(n_games, dtype=np.int64)
+        self.game_over = np.zeros(n_games, dtype=bool)
+        self.speed = np.zeros(n_games)
+        self.buffer = np.zeros(n_games)
+        self.reset()
+
+    def reset(self, games=None):
+        """
+        Reset the given games to the start of a new game, or every game if none are given
+
+        Parameters:
+        games: numpy.ndarray of indices or a boolean mask
+        """
+        if games is None:
+            games = np.arange(self.n_games)
+        elif getattr(games, "dtype", None) == bool:
+            games = np.flatnonzero(games)
+        count = len(games)
+        self.ball_x[games] = self.rng.integers(self.radius, self.width - self.radius, count)
+        self.ball_y[games] = self.height // 2
+        self.ball_dx[games] = 1
+        self.ball_dy[games] = -1
+        self.ball_speed[games] = self.start_ball_speed
+        self.paddle_x[games] = self.start_paddle_x
+        self.paddle_speed[games] = self.start_paddle_speed
+        self.block_alive[games] = True
+        self.score[games] = 0
+        self.game_over[games] = False
+
+    def tick(self, actions):
+        """
+        Advance every running game by one tick, games that are over are left untouched
+
+        Parameters:
+        actions: numpy.ndarray of -1, 0 or 1 per game
+        """
+        active = ~self.game_over
+        radius = self.radius
+
+        # Full size results go into arrays kept between ticks, for large batches allocating them every tick is
+        # slower than the arithmetic
+        buffer = self.buffer
+
+        # Move the paddles and ensure they stay inside the playable area
+        move_left = active & (actions < 0) & (self.paddle_x > 0)
+        move_right = active & (actions > 0) & (np.add(self.paddle_x, self.paddle_width, out=buffer) < self.width)
+        self.paddle_x += np.multiply(self.paddle_speed, move_right.view(np.int8) - move_left.view(np.int8),
+                                     out=buffer)
+
+        # Update ball positions
+        speed = np.multiply(self.ball_speed, active, out=self.speed)
+        self.ball_x += np.multiply(speed, self.ball_dx, out=buffer)
+        self.ball_y += np.multiply(speed, self.ball_dy, out=buffer)
+        x, y = self.ball_x, self.ball_y
+        dx, dy = self.ball_dx, self.ball_dy
+
+        bounce_off_walls(x, y, dx, dy, radius, self.width)
+
+        # Check collision with paddles for the balls falling through the paddles' row, steering the ball in the
+        # paddle's direction
+        falling = np.flatnonzero(active & (dy > 0) & (y > self.paddle_low) & (y < self.paddle_high))
+        f_x, f_y, f_paddle_x = x[falling], y[falling], self.paddle_x[falling]
+        hit_paddle = falling[(f_x - radius < f_paddle_x + self.paddle_width) & (f_x + radius > f_paddle_x)
+                             & (f_y - radius < self.paddle_y + self.paddle_height) & (f_y + radius > self.paddle_y)]
+        if len(hit_paddle):
+            p_dx, p_actions = dx[hit_paddle], actions[hit_paddle]
+            p_dx = np.where(p_actions < 0, -np.abs(p_dx), p_dx)
+            dx[hit_paddle] = np.where(p_actions > 0, np.abs(p_dx), p_dx)
+            dy[hit_paddle] = -dy[hit_paddle]
+
+        # Check collision with blocks for the balls level with the rows of blocks, each against the one block that
+        # can overlap it
+        near = np.flatnonzero(active & (y > self.blocks_low) & (y < self.blocks_high))
+        n_x, n_y = x[near], y[near]
+        n_left, n_top, n_right, n_bottom = n_x - radius, n_y - radius, n_x + radius, n_y + radius
+        slot = (((n_bottom - self.slot_y) / self.slot_height).astype(np.intp) * self.slot_columns
+                + ((n_right - self.slot_x) / self.slot_width).astype(np.intp))
+        candidate = self.slot_block[np.clip(slot, 0, len(self.slot_block) - 1, out=slot)]
+
+        # Most balls pass over blocks already destroyed, so the few candidates still alive are tested for overlap
+        alive = np.flatnonzero(self.block_alive.reshape(-1)[near * self.n_blocks
+                                                            + np.minimum(candidate, self.n_blocks - 1)])
+        hit = candidate[alive]
+        overlap = alive[(n_left[alive] < self.candidate_right[hit]) & (n_right[alive] > self.candidate_left[hit])
+                        & (n_top[alive] < self.candidate_bottom[hit]) & (n_bottom[alive] > self.candidate_top[hit])]
+        games, hit = near[overlap], candidate[overlap]
+        if len(games):
+            self.block_alive[games, hit] = False
+            self.score[games] += 1
+
+            g_dx, g_dy = dx[games], dy[games]
+            flip_x, flip_y = block_sides(g_dx, g_dy,
+                                         (n_left[overlap], n_top[overlap], n_right[overlap], n_bottom[overlap]),
+                                         (self.block_left[hit], self.block_top[hit], self.block_right[hit],
+                                          self.block_bottom[hit]))
+            dx[games] = np.where(flip_x, -g_dx, g_dx)
+            dy[games] = np.where(flip_y, -g_dy, g_dy)
+
+            if self.modifier == "speed":
+                # Increase ball and paddle speed based on the number of blocks hit
+                self.ball_speed[games] += 0.1 * self.score[games]
+                self.paddle_speed[games] += 0.1 * self.score[games]
+
+            # Every block is gone once a game has scored a point for each
+            self.game_over[games[self.score[games] == self.n_blocks]] = True
+
+        # A game also ends when its ball reaches the bottom
+        lost = np.flatnonzero(y > self.lost_y)
+        self.game_over[lost[y[lost] + radius >= self.height]] = True
+
+    def step(self, actions=0, n_ticks=1):
+        """
+        Advance every game by n_ticks with the given paddle directions, returns the blocks destroyed per game
+
+        Parameters:
+        actions: numpy.ndarray of -1, 0 or 1 per game, or a single int for all games
+        n_ticks: int
+        """
+        actions = np.broadcast_to(np.asarray(actions, dtype=np.int8), (self.n_games,))
+        start_score = self.score.copy()
+        for _ in range(n_ticks):
+            self.tick(actions)
+        return self.score - start_score
+
+class BatchPredictiveBot:
+    """
+    Class for the predictive bot of Bot.py over every game of a BatchSimulation at once, moving each paddle
+    under where its ball will come down
+
+    Landing points are projected through the wall reflections like Bot.landing_x, and only for the games whose
+    ball changed direction or destroyed a block since the last call, the rest keep their cached landing point
+
+    Parameters:
+    batch: BatchSimulation
+    dead_zone: float, how far a paddle's middle may be from the landing point before it moves
+    """
+    def __init__(self, batch, dead_zone=10):
+        self.batch = batch
+        self.dead_zone = dead_zone
+        self.dx = np.zeros(batch.n_games)
+        self.dy = np.zeros(batch.n_games)
+        self.score = np.full(batch.n_games, -1, dtype=np.int64)
+        self.target = np.zeros(batch.n_games)
+        self.aim_low = np.zeros(batch.n_games)
+        self.aim_high = np.zeros(batch.n_games)
+        self.predictions = 0
+
+    def project(self, games):
+        """
+        Method for projecting the landing x of the given games' balls, unfolding each path across mirrored screens
+
+        Parameters:
+        games: numpy.ndarray of indices
+        """
+        batch = self.batch
+        radius = batch.radius
+        x, y = batch.ball_x[games], batch.ball_y[games]
+        dx, dy = batch.ball_dx[games], batch.ball_dy[games]
+        target_y = batch.paddle_y - radius
+        span = batch.width - 2 * radius
+
+        # Falling balls go straight down, rising ones go up to the ceiling and back down first
+        distance = np.where(dy > 0, np.maximum(0.0, target_y - y), (y - radius) + (target_y - radius))
+        unfolded = (x - radius + distance * dx / np.abs(dy)) % (2 * span)
+        self.target[games] = radius + np.where(unfolded <= span, unfolded, 2 * span - unfolded)
+        self.predictions += len(games)
+
+        # Paddles already within the dead zone of the landing point stay put. The paddle speed only changes when a
+        # block is destroyed, which projects again, so the range of paddle x to stay in is worked out here. Never
+        # aim closer than half a move, or the paddle would step back and forth over the landing point
+        aim = self.target[games] - batch.paddle_width / 2
+        dead_zone = np.maximum(self.dead_zone, batch.paddle_speed[games] / 2)
+        self.aim_low[games] = aim - dead_zone
+        self.aim_high[games] = aim + dead_zone
+
+    def __call__(self):
+        """
+        Method for every game's paddle direction, -1, 0 or 1, for BatchSimulation.step
+        """
+        batch = self.batch
+        changed = np.flatnonzero((batch.ball_dx != self.dx) | (batch.ball_dy != self.dy) | (batch.score != self.score))
+        if len(changed):
+            self.dx[changed] = batch.ball_dx[changed]
+            self.dy[changed] = batch.ball_dy[changed]
+            self.score[changed] = batch.score[changed]
+            self.project(changed)
+        return (batch.paddle_x < self.aim_low).view(np.int8) - (batch.paddle_x > self.aim_high).view(np.int8)
@@ -0,0 +1,117 @@
+import argparse
+import time
+from random import Random
+from Simulation import BreakoutSimulation
+
+def landing_x(x, y, dx, dy, radius, width, target_y):
+    """
+    Function for projecting a ball's path through reflections off the side and top walls, returns the ball's x
+    when its center reaches target_y. Blocks are ignored, any bounce off one needs a new projection
+
+    The path is unfolded into a straight line across mirrored copies of the screen and folded back, so the
+    answer costs the same however many times the ball crosses the screen
+
+    Parameters:
+    x: float
+    y: float
+    dx: float
+    dy: float
+    radius: float
+    width: int
+    target_y: float
+    """
+    span = width - 2 * radius
+    if not dy or span <= 0:
+        return x
+    if dy > 0:
+        distance = max(0.0, target_y - y)
+    else:
+        distance = (y - radius) + (target_y - radius)  # Up to the ceiling and back down
+    unfolded = (x - radius + distance * dx / abs(dy)) % (2 * span)
+    return radius + (unfolded if unfolded <= span else 2 * span - unfolded)
+
+class PredictiveBot:
+    """
+    Class for a controller that moves the middle of the paddle to where the ball will come down
+
+    The landing point only changes when the ball bounces, so it is projected once per bounce and cached
+    against the ball's direction, the score and the number of extra balls. Instances are called with the
+    simulation like the controllers in Tournament.CONTROLLERS
+
+    Parameters:
+    dead_zone: float, how far the paddle's middle may be from the landing point before it moves
+    """
+    __slots__ = ("dead_zone", "ball", "dx", "dy", "score", "extra_balls", "target", "predictions")
+
+    def __init__(self, dead_zone=10):
+        self.dead_zone = dead_zone
+        self.ball = None
+        self.dx = self.dy = 0
+        self.score = self.extra_balls = 0
+        self.target = 0.0
+        self.predictions = 0
+
+    def __call__(self, simulation):
+        ball = simulation.ball
+        paddle = simulation.paddle
+        extra_balls = simulation.balls.count if simulation.balls is not None else 0
+
+        # Any bounce flips dx or dy, destroys a block or swaps in an extra ball, so only then is the path projected
+        if ball.dx != self.dx or ball.dy != self.dy or simulation.P1_score != self.score or ball is not self.ball \
+                or extra_balls != self.extra_balls:
+            self.ball, self.dx, self.dy = ball, ball.dx, ball.dy
+            self.score, self.extra_balls = simulation.P1_score, extra_balls
+            self.target = landing_x(ball.x, ball.y, ball.dx, ball.dy, ball.radius, simulation.width,
+                                    paddle.y - ball.radius)
+            self.predictions += 1
+
+        # Never aim closer than half a move, or the paddle would step back and forth over the landing point
+        offset = self.target - paddle.x - paddle.width / 2
+        dead_zone = paddle.speed * simulation.time_step / 2
+        if dead_zone < self.dead_zone:
+            dead_zone = self.dead_zone
+        if offset < -dead_zone:
+            return "left"
+        if offset > dead_zone:
+            return "right"
+        return None
+
+def soak(games, seed=0, modifier=None, max_ticks=100000):
+    """
+    Function for playing games headless with the bot, returns ((blocks destroyed, board cleared) per game, ticks played,
+    projections)
+
+    Parameters:
+    games: int
+    seed: int
+    modifier: str
+    max_ticks: int, per game
+    """
+    bot = PredictiveBot()
+    rng = Random(seed)
+    scores, ticks = [], 0
+    for _ in range(games):
+        simulation = BreakoutSimulation(modifier=modifier, rng=Random(rng.randrange(2 ** 63)))
+        for _ in range(max_ticks):
+            simulation.handle_input(bot(simulation))
+            simulation.handle_collisions()
+            ticks += 1
+            if simulation.game_over:
+                break
+        scores.append((simulation.P1_score, not simulation.block_grid.remaining))
+    return scores, ticks, bot.predictions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Soak test the predictive bot headless")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--modifier", choices=["speed", "multiball"])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    scores, ticks, predictions = soak(args.games, args.seed, args.modifier)
+    elapsed = time.perf_counter() - start
+    cleared = sum(cleared for _, cleared in scores)
+    print(f"{args.games} games, {ticks} ticks in {elapsed:.2f}s, {args.games / elapsed:.1f} games/s")
+    print(f"Average {sum(score for score, _ in scores) / len(scores):.1f} blocks destroyed, {cleared} boards cleared, "
+          f"{predictions} projections ({predictions / ticks:.1%} of ticks)")
@@ -1,39 +1,52 @@
-import pygame
-from random import randrange as rnd
-
-# Define game parameters
-HEIGHT = 800
-WIDTH = 1200
-FPS = 30
-
-class BlockGrid:
+import argparse
+from random import Random
+import Assets
+from Assets import pygame  # Loaded on first use, so importing the game does not load it
+import Simulation
+from Replay import Recording
+from Scenes import ModifierScene, PlayScene, SceneManager
+from Simulation import HEIGHT, WIDTH, FPS, BreakoutSimulation
+
+# Physics ticks per second and frames drawn per second, 0 draws frames as fast as possible
+PHYSICS_RATE = 120
+RENDER_FPS = 60
+
+# File the quick save key writes and the quick load key reads
+QUICKSAVE_PATH = "quicksave.sav"
+
+class BlockGrid(Simulation.BlockGrid):
     """
     Class for making grid consisting of interactive blocks
 
+    Blocks are drawn from sprites pre-rendered in a brick atlas, flat unless another atlas is set
+
     No parameters
     """
-    def __init__(self):
-        # Setting block size
-        self.width = 100
-        self.height = 50
-
-    def createGrid(self):
-        """
-        Method for making lists containing the positions and colors of each individual block in the grid
-        """
-        self.block_list = [pygame.Rect(10 + 120 * i, 10 + 70 * j, self.width, self.height) for i in range(10) for j in range(4)]
-        self.color_list = [(rnd(30, 256), rnd(30, 256), rnd(30, 256)) for _ in range(len(self.block_list))]
+    atlas = None
+    sprites = None
+    sprites_key = None
 
     def draw(self, display):
         """
-        Method for iterating through the block list and displaying each individual block on-screen
+        Method for displaying every alive block on-screen with a single blits call
+
+        The (atlas, position, area) sequence is only rebuilt when the board, the number of blocks left,
+        or the atlas surface changes
 
         Parameters:
         display: pygame.Surface
         """
-        [pygame.draw.rect(display, self.color_list[color], block) for color, block in enumerate(self.block_list)]
-
-class Paddle:
+        atlas = self.atlas if self.atlas is not None else Assets.cache.brick_atlas("flat")
+        key = self.sprites_key
+        if key is None or key[0] is not self.blocks or key[1] != self.remaining or key[2] is not atlas.surface:
+            areas = [atlas.area((width, height), color) if alive else None
+                     for (_, _, width, height), color, alive in zip(self.blocks, self.colors, self.alive)]
+            surface = atlas.surface  # Only final once every brick is on the atlas
+            self.sprites = [(surface, (x, y), area) for (x, y, _, _), area in zip(self.blocks, areas) if area is not None]
+            self.sprites_key = (self.blocks, self.remaining, surface)
+        display.blits(self.sprites, doreturn=False)
+
+class Paddle(Simulation.Paddle):
     """
     Class for the user-controlled paddle
 
@@ -42,25 +55,17 @@ class Paddle:
     height; int
     paddle_speed; int 
     """
-    def __init__(self, width, height, paddle_speed):
-        self.width = width
-        self.height = height
-        self.speed = paddle_speed
-        self.rect = pygame.Rect(WIDTH // 2 - self.width // 2, HEIGHT - self.height - 10, self.width, self.height)
-    
-    def move(self, direction):
+    @property
+    def rect(self):
         """
-        Method for moving the paddle left and right and ensuring it is inside the playable area
-
-        Parameters:
-        direction: str
+        The paddle's position as a pygame.Rect for drawing
         """
-        if direction == "left" and self.rect.left > 0:
-            self.rect.x -= self.speed
-        elif direction == "right" and self.rect.right < WIDTH:
-            self.rect.x += self.speed
+        return pygame.Rect(round(self.x), round(self.y), self.width, self.height)
 
-class Ball:
+# Every transparency the invisible modifier can give the ball, one step per block destroyed
+BALL_ALPHAS = [max(0, 255 - score * 20) for score in range(14)]
+
+class Ball(Simulation.Ball):
     """
     Class for the ball
 
@@ -68,24 +73,18 @@ class Ball:
     radius: int
     speed: int
     """
-    def __init__(self, radius, speed):
-        self.radius = radius
-        self.speed = speed
-        self.surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)  # Create transparent surface
-        self.original_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)  # Original surface for transparency
-        pygame.draw.circle(self.surface, (255, 255, 255), (radius, radius), radius)  # Draw a white circle on the surface
-        self.rect = self.surface.get_rect(center=(rnd(radius, WIDTH - radius), HEIGHT // 2))
-        self.dx = 1
-        self.dy = -1
-        self.original_surface.blit(self.surface, (0, 0))  # Copy surface to original_surface for transparency
-
-    def move(self):
-        """
-        Method for moving the ball across the x and y
-        """
-        self.rect.x += self.speed * self.dx
-        self.rect.y += self.speed * self.dy
-    
+    def __init__(self, radius, speed, screen_width=WIDTH, screen_height=HEIGHT, rng=None):
+        super().__init__(radius, speed, screen_width, screen_height, rng)
+        self.sprites = Assets.cache.ball(radius, BALL_ALPHAS)  # Pre-drawn sprites for each transparency
+        self.surface = self.sprites[255]
+
+    @property
+    def rect(self):
+        """
+        The ball's position as a pygame.Rect for drawing
+        """
+        return self.surface.get_rect(center=(round(self.x), round(self.y)))
+
     def update_transparency(self, score):
         """
         Method for changing the transparency of the ball based on score
@@ -94,228 +93,419 @@ class Ball:
         score: int
         """
         alpha = max(0, min(255, 255 - score * 20))  # Adjust the decrement value for desired transparency change
-        self.surface.set_alpha(alpha)  # Set transparency
+        self.surface = self.sprites[alpha]  # Swap to the sprite drawn with this transparency
 
 
 
-class BreakoutGame:
+class BreakoutGame(BreakoutSimulation):
     """
-    Class for handling game inputs, actions and events
+    Class for handling game inputs, rendering and events on top of the simulation
 
     Parameters:
     width: int
     height: int
+    dirty_rendering: bool, redraw only the areas that changed over a cached layer of the background and blocks
+    physics_rate: int, physics ticks per second
+    render_fps: int, frames drawn per second, 0 draws as fast as possible
+    vsync: bool, wait for the monitor instead of render_fps
+    seed: int, seed for the game's randomness, a random one if None
+    record_path: str, file the paddle inputs are saved to when the game closes, for replaying with Replay.py
+    profile: bool, time each phase of the loop and show the timings on screen
+    profile_path: str, file the timings are written to on exit
+    level: str, level file to play instead of the built-in grid
+    brick_style: str, one of Assets.BRICK_STYLES
+    particles: bool, burst destroyed blocks into debris
+    controller: callable like those in Tournament.CONTROLLERS, plays the paddle in attract mode
     """
-    def __init__(self, width, height):
+    ball_class = Ball
+    paddle_class = Paddle
+    block_grid_class = BlockGrid
+
+    def __init__(self, width, height, dirty_rendering=True, physics_rate=PHYSICS_RATE, render_fps=RENDER_FPS, vsync=False,
+                 seed=None, record_path=None, profile=False, profile_path=None, level=None,
+                 brick_style="flat", particles=True, controller=None):
         self.width = width
         self.height = height
-        self.fps = FPS
-        self.paddle_width = 300
-        self.paddle_height = 30
-        self.paddle_speed = 10
-        self.ball_speed = 5
         self.running = True
-        self.P1_score = 0
-        self.paddle_moving_direction = None
+        self.dirty_rendering = dirty_rendering
+        self.vsync = vsync
+        self.brick_style = brick_style
+        self.controller = controller
+        self.rewind = None
+        self.rewinding = False
+        self.interpolation = 1.0
+        self.seed = seed if seed is not None else Random().randrange(2 ** 63)
+        self.record_path = record_path
+        self.profile_path = profile_path
+        self.profiler = None
+        if profile or profile_path:
+            from Profiler import FrameProfiler  # Only loaded when profiling
+            self.profiler = FrameProfiler()
+        self.particles = None
+        if particles:
+            from Particles import ParticlePool  # NumPy is only needed with particles on
+            self.particles = ParticlePool(seed=self.seed)
+        self.dirty_rects = []
+        self.focused = True
+        self.minimized = False
+        self.scenes = SceneManager()
         self.initialize()
+        super().__init__(width, height, self.modifier, rng=Random(self.seed), level=level)
+        self.set_rates(physics_rate, render_fps)
+        self.start_recording()
+        if self.profiler is not None:
+            self.profiler.instrument(self)
 
-    def modifier_screen(self):
+    def start_recording(self):
         """
-        Display the modifier screen with options for playstyle
-        """
-        self.screen.fill((0, 0, 0))
-        font = pygame.font.Font(None, 36)
-        text1 = font.render("Choose a modifier:", True, pygame.Color('white'))
-        text_rect1 = text1.get_rect(center=(self.width // 2, self.height // 2 - 50))
-        text2 = font.render("1. Ball gradually becomes invisible", True, pygame.Color('white'))
-        text_rect2 = text2.get_rect(center=(self.width // 2, self.height // 2))
-        text3 = font.render("2. Ball speed increases with each hit", True, pygame.Color('white'))
-        text_rect3 = text3.get_rect(center=(self.width // 2, self.height // 2 + 50))
-        self.screen.blit(text1, text_rect1)
-        self.screen.blit(text2, text_rect2)
-        self.screen.blit(text3, text_rect3)
-        pygame.display.flip()
+        Start a new recording of the paddle inputs if the game is being recorded
+        """
+        self.recording = None
+        if self.record_path is not None and self.modifier != "Shutdown":
+            self.recording = Recording(self.seed, self.modifier, self.time_step, self.width, self.height, self.level)
 
-        # Handling of modification
-        modifier_chosen = False
-        while not modifier_chosen:
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_1:
-                        self.modifier = "invisible"
-                        modifier_chosen = True
-                    elif event.key == pygame.K_2:
-                        self.modifier = "speed"
-                        modifier_chosen = True
-                elif event.type == pygame.QUIT:
-                    self.modifier = "Shutdown"
-                    modifier_chosen = True
+    def set_rates(self, physics_rate, render_fps):
+        """
+        Set how many physics ticks and how many frames run per second, a render_fps of 0 is uncapped
 
-    def initialize(self):
+        Each tick covers FPS / physics_rate frames of the original game, so the game plays at the same speed at any rate,
+        and frames draw the ball and paddle part way between their last two ticks. The rewind buffer is made to hold
+        the last Snapshots.REWIND_SECONDS of ticks
+
+        Parameters:
+        physics_rate: int
+        render_fps: int
+        """
+        from Snapshots import REWIND_SECONDS, RewindBuffer  # NumPy is only needed once a game is played
+        self.physics_rate = physics_rate
+        self.fps = render_fps
+        self.time_step = FPS / physics_rate
+        self.rewind = None
+        if self.modifier != "Shutdown":
+            self.rewind = RewindBuffer(REWIND_SECONDS * physics_rate)
+            self.rewind.clear(self)
+
+    def modifier_screen(self):
         """
-        Initialize the pygame display and other necessary components
+        Display the modifier screen with options for playstyle, sleeping until one is chosen
+        """
+        self.scenes.run(ModifierScene(self))
+
+    def initialize(self):
         """
-        pygame.init()
-        self.screen = pygame.display.set_mode((self.width, self.height))
+        Initialize the pygame display and other necessary components, leaving out subsystems the game does not use
+        """
+        pygame.display.init()
+        pygame.font.init()
+        self.screen = None
+        if self.vsync:
+            try:
+                self.screen = pygame.display.set_mode((self.width, self.height), pygame.SCALED, vsync=1)
+            except pygame.error as e:
+                print("Vsync is not available:", e)
+        if self.screen is None:
+            self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Breakout Minigame")
         self.clock = pygame.time.Clock()
+        self.assets = Assets.cache
         self.load_assets()
         self.modifier_screen()
-        self.create_objects()
 
     def load_assets(self):
         """
-        Load background image for the game, with error handling
+        Load background image for the game through the asset cache, with error handling
         """
         try:
-            self.background_image = pygame.image.load('Background.jpg').convert()
-            self.background_image = pygame.transform.scale(self.background_image, (self.width, self.height))
+            self.background_image = self.assets.image('Background.jpg', (self.width, self.height))
         except pygame.error as e:
             print("Error loading background image:", e)
 
     def create_objects(self):
         """
-        Create instances of paddle, ball, and block grid
+        Create the game objects and mark the static layer for rebuilding
+        """
+        super().create_objects()
+        self.block_grid.atlas = self.assets.brick_atlas(self.brick_style)
+        if self.particles is not None:
+            self.particles.clear()
+        self.static_layer = None
+        self.destroyed_rects = []
+        self.previous_rects = []
+        self.save_positions()
+        if self.rewind is not None:
+            self.rewind.clear(self)
+
+    def save_positions(self):
+        """
+        Remember where the ball and paddle are before a tick, so frames can be drawn between ticks
         """
-        self.paddle = Paddle(self.paddle_width, self.paddle_height, self.paddle_speed)
-        self.ball = Ball(10, self.ball_speed)
-        self.block_grid = BlockGrid()
-        self.block_grid.createGrid()
+        self.previous_positions = (self.ball.x, self.ball.y, self.paddle.x)
+        if self.balls is not None:
+            self.balls.save_positions()
+
+    def sprite_rects(self):
+        """
+        The paddle and ball rects for drawing, placed between the last two ticks by the interpolation factor
+        """
+        ball_x, ball_y, paddle_x = self.previous_positions
+        t = self.interpolation
+        paddle_x += (self.paddle.x - paddle_x) * t
+        ball_x += (self.ball.x - ball_x) * t
+        ball_y += (self.ball.y - ball_y) * t
+        paddle_rect = pygame.Rect(round(paddle_x), round(self.paddle.y), self.paddle.width, self.paddle.height)
+        ball_rect = self.ball.surface.get_rect(center=(round(ball_x), round(ball_y)))
+        return paddle_rect, ball_rect
 
     def handle_events(self):
         """
-        Handle pygame events such as quitting the game
+        Handle pygame events such as quitting the game, and note when the window loses focus or is minimized.
+        F5 saves the game to QUICKSAVE_PATH and F9 loads it back
         """
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == pygame.WINDOWFOCUSLOST:
+                self.focused = False
+            elif event.type == pygame.WINDOWFOCUSGAINED:
+                self.focused = True
+            elif event.type in (pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN):
+                self.minimized = True
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                from Snapshots import write_save
+                write_save(QUICKSAVE_PATH, self, self.seed, self.level)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                self.load_game(QUICKSAVE_PATH)
+
+    def load_game(self, path):
+        """
+        Load a game saved by write_save, rebuilding the board from its seed and level. Leaves the current game as it
+        was if the save is missing or invalid, was made in a window of another size, or its level has moved or changed.
+        Any recording stops, since a replay has to start from the seed
 
-    def handle_input(self):
+        Parameters:
+        path: str
         """
-        Handle user input for moving the paddle
+        from Snapshots import read_save, restore
+        try:
+            seed, width, height, level, snapshot = read_save(path)
+            if (width, height) != (self.width, self.height):
+                return  # The board and paddle were laid out for the other window
+            # Rebuild the board on a scratch simulation first, so a level that no longer fits the save fails here
+            restore(BreakoutSimulation(width, height, self.modifier, self.time_step, Random(seed), level), snapshot)
+        except (OSError, ValueError):
+            return
+        self.seed, self.level, self.rng = seed, level, Random(seed)
+        self.reset(self.modifier)
+        restore(self, snapshot)
+        if self.modifier == "invisible":
+            self.ball.update_transparency(self.P1_score)
+        self.rewind.clear(self)
+        self.save_positions()
+        self.recording = None
+
+    def read_input(self):
+        """
+        Read the paddle direction for the next tick from the keyboard, or ask the controller in attract mode until
+        the player presses a movement key and takes over. While Backspace is held the tick rewinds the game instead,
+        up to Snapshots.REWIND_SECONDS back, and the direction is None
         """
         keys = pygame.key.get_pressed()
+        self.rewinding = keys[pygame.K_BACKSPACE] and self.rewind is not None and len(self.rewind) > 1
+        if self.rewinding:
+            return None
         if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.paddle.move("left")
-            self.paddle_moving_direction = "left"
+            direction = "left"
         elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.paddle.move("right")
-            self.paddle_moving_direction = "right"
+            direction = "right"
         else:
-            self.paddle_moving_direction = None
+            direction = None
+        if direction is not None:
+            self.controller = None  # The player takes over from attract mode
+        elif self.controller is not None:
+            direction = self.controller(self)
+        return direction
 
-    def handle_collisions(self):
+    def handle_input(self, direction):
         """
-        Handle collisions of the ball with walls, paddle, and blocks
-        """
-        # Update ball position
-        self.ball.move()
-
-        # Check collisions with walls
-        if self.ball.rect.centerx < self.ball.radius or self.ball.rect.centerx > self.width - self.ball.radius:
-            self.ball.dx = -self.ball.dx
-        if self.ball.rect.centery < self.ball.radius:
-            self.ball.dy = -self.ball.dy
-
-        # Check collision with paddle
-        if self.ball.rect.colliderect(self.paddle.rect) and self.ball.dy > 0:
-            # Adjust ball's horizontal velocity based on paddle's movement direction
-            if self.paddle_moving_direction == "left":
-                self.ball.dx = -abs(self.ball.dx)
-            elif self.paddle_moving_direction == "right":
-                self.ball.dx = abs(self.ball.dx)
-            else:
-                # If the ball is moving straight up, adjust its trajectory
-                if self.ball.dy < 0:
-                    self.ball.dx = -abs(self.ball.dx) if self.ball.dx > 0 else abs(self.ball.dx)
-
-            self.ball.dy = -self.ball.dy
-
-        # Check collision with blocks
-        hit_index = self.ball.rect.collidelist(self.block_grid.block_list)
-        if hit_index != -1:
-            hit_rect = self.block_grid.block_list.pop(hit_index)
-            self.block_grid.color_list.pop(hit_index)            
-            self.P1_score += 1
-
-            # Determine the side of the block hit by the ball
-            if self.ball.dx > 0:  # Ball moving right
-                if self.ball.rect.right > hit_rect.left and self.ball.rect.left < hit_rect.left:
-                    self.ball.dx = -self.ball.dx
-            else:  # Ball moving left
-                if self.ball.rect.left < hit_rect.right and self.ball.rect.right > hit_rect.right:
-                    self.ball.dx = -self.ball.dx
-
-            if self.ball.dy > 0:  # Ball moving down
-                if self.ball.rect.bottom > hit_rect.top and self.ball.rect.top < hit_rect.top:
-                    self.ball.dy = -self.ball.dy
-            else:  # Ball moving up
-                if self.ball.rect.top < hit_rect.bottom and self.ball.rect.bottom > hit_rect.bottom:
-                    self.ball.dy = -self.ball.dy
-
-            if self.modifier == "speed":
-                # Increase ball speed based on the number of blocks hit
-                self.ball.speed += 0.1 * self.P1_score
-
-                # Increase paddle speed based on the number of blocks hit
-                self.paddle.speed += 0.1 * self.P1_score
-            elif self.modifier == "invisible":
-                self.ball.update_transparency(self.P1_score)  # Update ball transparency based on score
+        Move the paddle in the given direction and add it to the recording, the paddle stays put on a rewound tick
 
+        Parameters:
+        direction: str
+        """
+        if self.rewinding:
+            return
+        if self.recording is not None:
+            self.recording.record(direction)
+        super().handle_input(direction)
+
+    def handle_collisions(self):
+        """
+        Handle collisions through the simulation and update the ball's transparency when a block is hit,
+        or step back a tick while rewinding
+        """
+        previous_score = self.P1_score
+        if self.rewinding:
+            self.rewind_tick()
+        else:
+            super().handle_collisions()
+            self.rewind.push(self)
+        if self.modifier == "invisible" and self.P1_score != previous_score:
+            self.ball.update_transparency(self.P1_score)  # Update ball transparency based on score
+
+        # Remember where blocks disappeared so only those areas of the static layer are redrawn
+        for index, _ in self.last_hits:
+            self.destroyed_rects.append(pygame.Rect(self.block_grid.blocks[index]))
+            if self.particles is not None:
+                self.particles.burst(self.destroyed_rects[-1], self.screen.map_rgb(self.block_grid.colors[index]))
+        if self.particles is not None:
+            self.particles.tick(self.time_step, self.width, self.height)
+
+    def rewind_tick(self):
+        """
+        Step the game back one tick, dropping that tick's input from the recording so it still replays
+        """
+        remaining = self.block_grid.remaining
+        self.rewind.pop(self)
+        if self.recording is not None and self.recording.directions:
+            del self.recording.directions[-1]
+        if self.block_grid.remaining != remaining:
+            self.static_layer = None  # Blocks came back, so the static layer is drawn again
 
     def update_screen(self):
         """
-        Update the screen with game objects
+        Update the screen with game objects, in three phases so each can be timed on its own
+        """
+        self.blit_screen()
+        self.draw_screen()
+        if self.profiler is not None:
+            self.previous_rects += self.profiler.draw_overlay(self.screen, self.clock, self.assets)
+        self.flip_screen()
+
+    def build_static_layer(self):
+        """
+        Draw the background and blocks onto an offscreen surface and show it as a full frame
         """
-        self.screen.blit(self.background_image, (0, 0))
-        self.block_grid.draw(self.screen)
-        pygame.draw.rect(self.screen, pygame.Color('darkorange'), self.paddle.rect)
-        self.screen.blit(self.ball.surface, self.ball.rect)
+        self.static_layer = self.background_image.copy()
+        self.block_grid.draw(self.static_layer)
+        self.screen.blit(self.static_layer, (0, 0))
+        self.destroyed_rects = []
+        self.previous_rects = []
         pygame.display.flip()
 
-    def reset_screen(self):
+    def blit_screen(self):
         """
-        Reset the game screen and modifier choice
+        Put the background back, either over the whole screen or, with dirty rendering, only where things changed
         """
-        self.modifier = None
-        self.create_objects()
-        self.P1_score = 0
+        if not self.dirty_rendering:
+            self.screen.blit(self.background_image, (0, 0))
+            return
+        if self.static_layer is None:
+            self.build_static_layer()
+        self.dirty_rects = self.previous_rects + self.destroyed_rects
+
+        # Clear destroyed blocks from the static layer, then restore it wherever the paddle and ball were
+        for rect in self.destroyed_rects:
+            self.static_layer.blit(self.background_image, rect, rect)
+        self.screen.blits([(self.static_layer, rect, rect) for rect in self.dirty_rects], doreturn=False)
+        self.destroyed_rects = []
 
-    def end_screen(self):
+    def draw_screen(self):
         """
-        Display the end screen with the final score
+        Draw the blocks, unless they are on the static layer, then the particles, paddle and ball
         """
-        self.screen.fill((0, 0, 0))
-        font = pygame.font.Font(None, 36)
-        text = font.render(f"Game Over! Blocks Destroyed: {self.P1_score}", True, pygame.Color('white'))
-        text_rect = text.get_rect(center=(self.width // 2, self.height // 2))
-        self.screen.blit(text, text_rect)
-        pygame.display.flip()
-        pygame.time.delay(3000)  # Display the end screen for 3 seconds before quitting
-        self.running = False
+        if not self.dirty_rendering:
+            self.block_grid.draw(self.screen)
+        particles_rect = self.particles.draw(self.screen) if self.particles is not None else None
+        paddle_rect, ball_rect = self.sprite_rects()
+        pygame.draw.rect(self.screen, pygame.Color('darkorange'), paddle_rect)
+        self.screen.blit(self.ball.surface, ball_rect)
+        self.previous_rects = [paddle_rect, ball_rect]
+        if particles_rect is not None:
+            self.previous_rects.append(particles_rect)
 
-    def run(self):
+        # Extra balls share one sprite and are drawn in a single call
+        if self.balls is not None and self.balls.count:
+            sprite = self.ball.sprites[255]
+            self.previous_rects += self.screen.blits([(sprite, position) for position in self.balls.positions(self.interpolation)])
+
+    def flip_screen(self):
         """
-        Main game loop
+        Show the frame, pushing only the changed areas with dirty rendering
         """
-        # Checks if the game is supposed to be running, and not being told to shut down
-        while self.running and self.modifier != "Shutdown":
-            # If the game is supposed to run, continue as normal
-            self.handle_events()
-            self.handle_input()
-            self.handle_collisions()
-            self.update_screen()
+        if self.dirty_rendering:
+            pygame.display.update(self.dirty_rects + self.previous_rects)
+        else:
+            pygame.display.flip()
 
-            # Check if the ball hits the bottom of the screen
-            if self.ball.rect.bottom >= self.height:
-                self.end_screen()  # Call the end screen function
+    def reset_screen(self):
+        """
+        Reset the game screen and modifier choice, starting from a fresh seed
+        """
+        self.seed = self.rng.randrange(2 ** 63)
+        self.rng = Random(self.seed)
+        self.reset()
+        self.start_recording()
 
-            # On-screen updates are handled using the fps tied to the class
-            self.clock.tick(self.fps)
+    def run(self):
+        """
+        Main game loop, run as a play scene followed by the end screen
+        """
+        if self.modifier != "Shutdown":
+            self.scenes.run(PlayScene(self))
 
+        # Save the inputs along with the state the game finished in, so a replay can be checked against it
+        if self.recording is not None:
+            self.recording.finish(self)
+            self.recording.save(self.record_path)
+        if self.profiler is not None and self.profile_path is not None:
+            self.profiler.dump(self.profile_path)
         pygame.quit()
 
+def play_headless(seed=None, record_path=None, level=None, controller="follow"):
+    """
+    Function for playing a game at the physics rate without pygame, the paddle moved by one of
+    Tournament.CONTROLLERS, returns the number of blocks destroyed
+
+    Parameters:
+    seed: int
+    record_path: str
+    level: str
+    controller: str
+    """
+    from Tournament import make_controller
+    control = make_controller(controller)
+    seed = seed if seed is not None else Random().randrange(2 ** 63)
+    simulation = BreakoutSimulation(time_step=FPS / PHYSICS_RATE, rng=Random(seed), level=level)
+    recording = Recording(seed, None, simulation.time_step, simulation.width, simulation.height, level)
+    while not simulation.game_over and len(recording.directions) < 100000:
+        direction = control(simulation)
+        recording.record(direction)
+        simulation.step(direction)
+    if record_path is not None:
+        recording.finish(simulation)
+        recording.save(record_path)
+    return simulation.P1_score
+
 # Function that makes the file only run if run directly, or called seperately
 if __name__ == '__main__':
-    game = BreakoutGame(WIDTH, HEIGHT)
-    game.run()
\ No newline at end of file
+    from Tournament import CONTROLLERS, make_controller
+    parser = argparse.ArgumentParser(description="Breakout Minigame")
+    parser.add_argument("--seed", type=int, help="seed for the ball start and block colors")
+    parser.add_argument("--record", metavar="PATH", help="save the game's inputs for replaying with Replay.py")
+    parser.add_argument("--level", metavar="PATH", help="play a level file instead of the built-in grid")
+    parser.add_argument("--profile", action="store_true", help="show per-phase frame timings on screen")
+    parser.add_argument("--profile-out", metavar="PATH", help="save frame timings as CSV, or a Chrome trace if PATH ends in .json")
+    parser.add_argument("--bricks", choices=Assets.BRICK_STYLES, default="flat", help="how the blocks are drawn")
+    parser.add_argument("--no-particles", action="store_true", help="let destroyed blocks vanish without debris")
+    parser.add_argument("--headless", action="store_true", help="play without a window, the paddle moved by --bot")
+    parser.add_argument("--bot", choices=list(CONTROLLERS),
+                        help="controller for the headless paddle, follow by default, or attract mode in a window")
+    args = parser.parse_args()
+    if args.headless:
+        print(f"Blocks Destroyed: {play_headless(args.seed, args.record, args.level, args.bot or 'follow')}")
+    else:
+        controller = make_controller(args.bot) if args.bot is not None else None
+        game = BreakoutGame(WIDTH, HEIGHT, seed=args.seed, record_path=args.record,
+                            profile=args.profile, profile_path=args.profile_out, level=args.level,
+                            brick_style=args.bricks, particles=not args.no_particles, controller=controller)
+        game.run()
\ No newline at end of file
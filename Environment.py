@@ -0,0 +1,180 @@
+from random import Random
+import numpy as np
+from Simulation import BreakoutSimulation
+
+# Actions as indices, in the order an agent picks them
+ACTIONS = [None, "left", "right"]
+
+# Ball and paddle values at the start of the state vector, followed by one entry per block
+STATE_FIELDS = ["ball_x", "ball_y", "ball_dx", "ball_dy", "ball_speed", "paddle_x"]
+
+class BreakoutEnv:
+    """
+    Class for a Gym-style reinforcement learning environment around the headless simulation
+
+    Observations are either a state vector (ball, paddle and block-alive mask) or pixels. Pixels are drawn
+    by pygame straight into NumPy memory at the downscaled size, and stacked frames are kept twice in a
+    ring of 2 * frame_stack slots so the latest stack is always one contiguous slice.
+    The returned observation is a view that the next step overwrites, copy it to keep it
+
+    Parameters:
+    observation: str, "state" or "pixels"
+    downscale: int
+    frame_stack: int
+    frame_skip: int
+    modifier: str
+    max_ticks: int
+    level: str
+    """
+    def __init__(self, observation="state", downscale=1, frame_stack=1, frame_skip=1, modifier=None,
+                 max_ticks=20000, level=None):
+        if observation not in ("state", "pixels"):
+            raise ValueError(f"observation must be 'state' or 'pixels', not {observation!r}")
+        self.observation = observation
+        self.downscale = downscale
+        self.frame_stack = frame_stack
+        self.frame_skip = frame_skip
+        self.max_ticks = max_ticks
+        self.simulation = BreakoutSimulation(modifier=modifier, level=level)
+        self.action_count = len(ACTIONS)
+        self.ticks = 0
+
+        simulation = self.simulation
+        self.state = np.zeros(len(STATE_FIELDS) + len(simulation.block_grid.blocks), dtype=np.float32)
+        if observation == "pixels":
+            self.create_frames()
+
+    def create_frames(self):
+        """
+        Method for allocating the frame ring and the pygame surfaces that draw into it
+        """
+        import pygame  # Only pixel observations need pygame
+        self.pygame = pygame
+        width = self.simulation.width // self.downscale
+        height = self.simulation.height // self.downscale
+        slots = 2 * self.frame_stack if self.frame_stack > 1 else 1
+        self.frames = np.zeros((slots, height, width, 3), dtype=np.uint8)
+        self.surfaces = [pygame.image.frombuffer(self.frames[slot], (width, height), "RGB") for slot in range(slots)]
+        self.block_layer = pygame.Surface((width, height), depth=24)
+        self.slot = 0
+
+    def reset(self, seed=None, modifier=None):
+        """
+        Method for starting a new game, returns (observation, info)
+
+        Parameters:
+        seed: int
+        modifier: str
+        """
+        simulation = self.simulation
+        if seed is not None:
+            simulation.rng = Random(seed)
+        simulation.reset(modifier if modifier is not None else simulation.modifier)
+        self.ticks = 0
+        self.alive = np.frombuffer(simulation.block_grid.alive, dtype=np.uint8)  # Shares the grid's own bitmap
+        if self.state.shape[0] != len(STATE_FIELDS) + len(self.alive):
+            self.state = np.zeros(len(STATE_FIELDS) + len(self.alive), dtype=np.float32)
+        if self.observation == "pixels":
+            self.draw_blocks()
+            for _ in range(self.frame_stack):
+                self.draw_frame()
+        return self.observe(), {}
+
+    def step(self, action):
+        """
+        Method for moving the paddle for frame_skip ticks, returns (observation, reward, terminated, truncated, info)
+
+        The reward is the number of blocks destroyed during the step
+
+        Parameters:
+        action: int, an index into ACTIONS
+        """
+        simulation = self.simulation
+        reward = 0
+        for _ in range(self.frame_skip):
+            reward += simulation.step(ACTIONS[action])
+            self.ticks += 1
+            if self.observation == "pixels" and simulation.last_hits:
+                self.clear_blocks(simulation.last_hits)
+            if simulation.game_over:
+                break
+        if self.observation == "pixels":
+            self.draw_frame()
+        truncated = not simulation.game_over and self.ticks >= self.max_ticks
+        return self.observe(), reward, simulation.game_over, truncated, {"score": simulation.P1_score}
+
+    def observe(self):
+        """
+        Method for the current observation, a view into memory the next step reuses
+        """
+        if self.observation == "pixels":
+            if len(self.frames) == 1:
+                return self.frames[0]
+            return self.frames[self.slot:self.slot + self.frame_stack]
+        simulation = self.simulation
+        ball, paddle, state = simulation.ball, simulation.paddle, self.state
+        state[0] = ball.x / simulation.width
+        state[1] = ball.y / simulation.height
+        state[2] = ball.dx
+        state[3] = ball.dy
+        state[4] = ball.speed
+        state[5] = paddle.x / simulation.width
+        state[len(STATE_FIELDS):] = self.alive
+        return state
+
+    def draw_blocks(self):
+        """
+        Method for drawing every alive block onto the downscaled block layer
+        """
+        scale = 1 / self.downscale
+        self.block_layer.fill((0, 0, 0))
+        grid = self.simulation.block_grid
+        for (x, y, width, height), color, alive in zip(grid.blocks, grid.colors, grid.alive):
+            if alive:
+                self.pygame.draw.rect(self.block_layer, color, self.scaled(x, y, width, height, scale))
+
+    def clear_blocks(self, hits):
+        """
+        Method for removing destroyed blocks from the block layer
+
+        Parameters:
+        hits: list of (index, face)
+        """
+        scale = 1 / self.downscale
+        for index, _ in hits:
+            self.block_layer.fill((0, 0, 0), self.scaled(*self.simulation.block_grid.blocks[index], scale))
+
+    @staticmethod
+    def scaled(x, y, width, height, scale):
+        """
+        Function for a rect scaled down, never smaller than one pixel
+        """
+        return (round(x * scale), round(y * scale), max(1, round(width * scale)), max(1, round(height * scale)))
+
+    def draw_frame(self):
+        """
+        Method for drawing the newest frame into the ring, in both of its slots when frames are stacked
+        """
+        pygame = self.pygame
+        simulation = self.simulation
+        scale = 1 / self.downscale
+        paddle, ball = simulation.paddle, simulation.ball
+        paddle_rect = self.scaled(paddle.x, paddle.y, paddle.width, paddle.height, scale)
+        ball_center = (round(ball.x * scale), round(ball.y * scale))
+        ball_radius = max(1, round(ball.radius * scale))
+        if len(self.frames) == 1:
+            slots = [0]
+        else:
+            # Slot k and k + frame_stack always hold the same frame, so the newest stack is contiguous
+            self.slot = (self.slot + 1) % self.frame_stack
+            newest = self.slot + self.frame_stack - 1
+            slots = [newest, (newest - self.frame_stack) % len(self.frames)]
+        for slot in slots:
+            surface = self.surfaces[slot]
+            surface.blit(self.block_layer, (0, 0))
+            pygame.draw.rect(surface, (255, 140, 0), paddle_rect)
+            pygame.draw.circle(surface, (255, 255, 255), ball_center, ball_radius)
+            if simulation.balls is not None:
+                for position in simulation.balls.positions(1.0):
+                    center = (round((position[0] + ball.radius) * scale), round((position[1] + ball.radius) * scale))
+                    pygame.draw.circle(surface, (255, 255, 255), center, ball_radius)
@@ -0,0 +1,193 @@
+import mmap
+import struct
+
+# Binary level layout, every section padded to 4 bytes:
+# header, blocks as int32 (x, y, width, height), colors as uint8 (r, g, b), hit points as uint8,
+# then the BlockGrid cell index as uint32 cell starts followed by uint32 block indices
+MAGIC = b"BRKL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIiiIIIII")
+
+class PackedRecords:
+    """
+    Class for a read-only sequence of tuples packed in a buffer, unpacked only when an item is used
+
+    Parameters:
+    buffer: memoryview
+    format: str
+    """
+    __slots__ = ("buffer", "record")
+
+    def __init__(self, buffer, format):
+        self.buffer = buffer
+        self.record = struct.Struct(format)
+
+    def __len__(self):
+        return len(self.buffer) // self.record.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        return self.record.unpack_from(self.buffer, index * self.record.size)
+
+    def __iter__(self):
+        return self.record.iter_unpack(self.buffer)
+
+class PackedCells:
+    """
+    Class for a BlockGrid cell index read straight from a buffer, the blocks of cell i are
+    blocks[starts[i]:starts[i + 1]]
+
+    Parameters:
+    starts: memoryview of uint32
+    blocks: memoryview of uint32
+    """
+    __slots__ = ("starts", "blocks")
+
+    def __init__(self, starts, blocks):
+        self.starts = starts
+        self.blocks = blocks
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def __getitem__(self, key):
+        starts = self.starts
+        if isinstance(key, slice):
+            return [self.blocks[starts[cell]:starts[cell + 1]] for cell in range(*key.indices(len(self)))]
+        return self.blocks[starts[key]:starts[key + 1]]
+
+def padding(size):
+    """
+    Function for the number of zero bytes that bring a section up to a multiple of 4 bytes
+
+    Parameters:
+    size: int
+    """
+    return -size % 4
+
+def save_binary(path, block_grid):
+    """
+    Function for writing a block grid, including its cell index, as a binary level
+
+    Parameters:
+    path: str
+    block_grid: BlockGrid
+    """
+    count = len(block_grid.blocks)
+    cells = [list(cell) for cell in block_grid.cells]
+    starts = [0]
+    for cell in cells:
+        starts.append(starts[-1] + len(cell))
+    header = HEADER.pack(MAGIC, VERSION, 0, count, int(block_grid.origin_x), int(block_grid.origin_y),
+                         int(block_grid.cell_width), int(block_grid.cell_height), block_grid.columns,
+                         block_grid.rows, starts[-1])
+    with open(path, "wb") as file:
+        file.write(header)
+        file.write(b"".join(struct.pack("<4i", *block) for block in block_grid.blocks))
+        file.write(b"".join(struct.pack("3B", *color) for color in block_grid.colors) + bytes(padding(3 * count)))
+        file.write(bytes(max(1, hit_points) for hit_points in block_grid.hit_points) + bytes(padding(count)))
+        file.write(struct.pack(f"<{len(starts)}I", *starts))
+        file.write(struct.pack(f"<{starts[-1]}I", *(index for cell in cells for index in cell)))
+
+def load_binary(path, block_grid):
+    """
+    Function for memory-mapping a binary level into a block grid, without unpacking any block up front
+
+    Blocks and colors are read from the mapped file as they are used and the stored cell index is used as is,
+    with one pass over the hit points and cell entries to check them. Raises ValueError if the file is not a level,
+    is shorter than its header says, has a block with no hit points or a cell listing a block that does not exist
+
+    Parameters:
+    path: str
+    block_grid: BlockGrid
+    """
+    with open(path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(buffer)
+    if len(view) < HEADER.size:
+        raise ValueError(f"{path} is not a version {VERSION} Breakout level")
+    (magic, version, _, count, origin_x, origin_y, cell_width, cell_height,
+     columns, rows, entries) = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} Breakout level")
+
+    # Walk through the sections in the order they were written
+    offset = HEADER.size
+    sections = []
+    for size in (16 * count, 3 * count, count, 4 * (columns * rows + 1), 4 * entries):
+        if offset + size > len(view):
+            raise ValueError(f"{path} is truncated, the header describes {count} blocks")
+        sections.append(view[offset:offset + size])
+        offset += size + padding(size)
+    blocks, colors, hit_points, starts, cell_blocks = sections
+    cell_blocks = cell_blocks.cast("I")  # Little-endian hosts only
+    if 0 in hit_points.tobytes():
+        raise ValueError(f"{path} has a block with 0 hit points, blocks need between 1 and 255")
+    if entries and max(cell_blocks) >= count:
+        raise ValueError(f"{path} has a cell listing block {max(cell_blocks)}, the level has {count} blocks")
+
+    block_grid.blocks = PackedRecords(blocks, "<4i")
+    block_grid.colors = PackedRecords(colors, "3B")
+    block_grid.hit_points = bytearray(hit_points)
+    block_grid.alive = bytearray(b"\x01") * count
+    block_grid.remaining = count
+    block_grid.origin_x, block_grid.origin_y = origin_x, origin_y
+    block_grid.cell_width, block_grid.cell_height = cell_width, cell_height
+    block_grid.columns, block_grid.rows = columns, rows
+    block_grid.cells = PackedCells(starts.cast("I"), cell_blocks)
+
+def save_text(path, block_grid):
+    """
+    Function for writing a block grid as a text level, one "x y width height hit_points r g b" line per block
+
+    Parameters:
+    path: str
+    block_grid: BlockGrid
+    """
+    with open(path, "w") as file:
+        file.write("# Breakout level: x y width height [hit_points [r g b]]\n")
+        for (x, y, width, height), hit_points, (r, g, b) in zip(block_grid.blocks, block_grid.hit_points, block_grid.colors):
+            file.write(f"{x} {y} {width} {height} {max(1, hit_points)} {r} {g} {b}\n")
+
+def load_text(path, block_grid):
+    """
+    Function for reading a text level into a block grid, blocks without a color are white and have one hit point
+    if none is given. Raises ValueError on a malformed line, hit points outside 1 to 255 or colors outside 0 to 255
+
+    Parameters:
+    path: str
+    block_grid: BlockGrid
+    """
+    blocks, colors, hit_points = [], [], []
+    with open(path) as file:
+        for number, line in enumerate(file, 1):
+            fields = line.split("#", 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) not in (4, 5, 8):
+                raise ValueError(f"{path}:{number}: expected x y width height [hit_points [r g b]]")
+            values = [int(field) for field in fields]
+            if len(values) > 4 and not 1 <= values[4] <= 255:
+                raise ValueError(f"{path}:{number}: hit points must be between 1 and 255, got {values[4]}")
+            if not all(0 <= value <= 255 for value in values[5:8]):
+                raise ValueError(f"{path}:{number}: colors must be between 0 and 255, got {' '.join(fields[5:8])}")
+            blocks.append(tuple(values[:4]))
+            hit_points.append(values[4] if len(values) > 4 else 1)
+            colors.append(tuple(values[5:8]) if len(values) == 8 else (255, 255, 255))
+    block_grid.set_blocks(blocks, colors, hit_points)
+
+def load_level(path, block_grid):
+    """
+    Function for loading a level of either format into a block grid, telling them apart by the binary header
+
+    Parameters:
+    path: str
+    block_grid: BlockGrid
+    """
+    with open(path, "rb") as file:
+        is_binary = file.read(len(MAGIC)) == MAGIC
+    if is_binary:
+        load_binary(path, block_grid)
+    else:
+        load_text(path, block_grid)
@@ -0,0 +1,276 @@
+import math
+import numpy as np
+from Arrays import block_sides, bounce_off_walls, keep
+
+# Most extra balls in play at once
+MAX_BALLS = 512
+
+# Directions given to the copies when a ball splits, fanned out upwards and never flat or straight up
+SPLIT_ANGLES = [-math.pi / 2 + (k - 3) * math.pi / 10 for k in range(7)]
+
+class BlockArrays:
+    """
+    Class for a NumPy copy of a BlockGrid's block edges and cell index, for testing many balls at once
+
+    The alive mask is a view of the grid's own bitmap, so blocks destroyed through the grid show up here straight away
+
+    Parameters:
+    block_grid: BlockGrid
+    """
+    __slots__ = ("blocks", "left", "top", "right", "bottom", "alive", "cells", "origin_x", "origin_y",
+                 "cell_width", "cell_height", "columns", "rows")
+
+    def __init__(self, block_grid):
+        self.blocks = block_grid.blocks
+        buffer = getattr(block_grid.blocks, "buffer", None)  # Blocks loaded from a binary level are already packed
+        if buffer is not None:
+            edges = np.frombuffer(buffer, dtype="<i4").astype(np.float64).reshape(-1, 4)
+        else:
+            edges = np.array(block_grid.blocks, dtype=np.float64).reshape(-1, 4)
+        self.left = edges[:, 0]
+        self.top = edges[:, 1]
+        self.right = edges[:, 0] + edges[:, 2]
+        self.bottom = edges[:, 1] + edges[:, 3]
+        self.alive = np.frombuffer(block_grid.alive, dtype=np.uint8)
+        self.columns = block_grid.columns
+        self.rows = block_grid.rows
+        self.origin_x, self.origin_y = block_grid.origin_x, block_grid.origin_y
+        self.cell_width, self.cell_height = block_grid.cell_width, block_grid.cell_height
+
+        # Lay the cell index out flat, as a binary level already stores it
+        cells = block_grid.cells
+        if hasattr(cells, "starts"):
+            starts = np.frombuffer(cells.starts, dtype=np.uint32).astype(np.int64)
+            cell_blocks = np.frombuffer(cells.blocks, dtype=np.uint32).astype(np.int64)
+        else:
+            starts = np.cumsum([0] + [len(cell) for cell in cells])
+            cell_blocks = np.array([index for cell in cells for index in cell], dtype=np.int64)
+
+        # Pad every cell's block list to the same length with -1 so cells can be gathered as one array
+        lengths = np.diff(starts)
+        self.cells = np.full((len(lengths), max(1, int(lengths.max(initial=0)))), -1, dtype=np.int64)
+        cell_of_entry = np.repeat(np.arange(len(lengths)), lengths)
+        self.cells[cell_of_entry, np.arange(len(cell_blocks)) - starts[cell_of_entry]] = cell_blocks
+
+class BallStore:
+    """
+    Class for the extra balls of multi-ball play, stored as one array per attribute instead of one object per ball
+
+    Extra balls move in small enough steps that none can pass through a block, and bounce off the walls, paddle and
+    blocks by the same rules as the per-tick overlap test in BatchSimulation
+
+    Parameters:
+    radius: int
+    capacity: int
+    """
+    __slots__ = ("radius", "capacity", "count", "x", "y", "dx", "dy", "speed", "previous_x", "previous_y",
+                 "block_arrays")
+
+    def __init__(self, radius, capacity=MAX_BALLS):
+        self.radius = radius
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.previous_x = np.zeros(capacity)
+        self.previous_y = np.zeros(capacity)
+        self.block_arrays = None
+
+    def add(self, x, y, dx, dy, speed):
+        """
+        Method for adding a ball, returns False if the store is full
+
+        Parameters:
+        x: float
+        y: float
+        dx: float
+        dy: float
+        speed: float
+        """
+        if self.count >= self.capacity:
+            return False
+        index = self.count
+        self.x[index] = self.previous_x[index] = x
+        self.y[index] = self.previous_y[index] = y
+        self.dx[index] = dx
+        self.dy[index] = dy
+        self.speed[index] = speed
+        self.count += 1
+        return True
+
+    def split(self, x, y, speed):
+        """
+        Method for adding the fan of copies made when a ball at (x, y) splits
+
+        Parameters:
+        x: float
+        y: float
+        speed: float
+        """
+        for angle in SPLIT_ANGLES:
+            if not self.add(x, y, math.sqrt(2) * math.cos(angle), math.sqrt(2) * math.sin(angle), speed):
+                break
+
+    def promote(self, ball):
+        """
+        Method for moving the last extra ball into the given ball, used when the main ball is lost
+
+        Parameters:
+        ball: Ball
+        """
+        self.count -= 1
+        index = self.count
+        ball.x, ball.y = float(self.x[index]), float(self.y[index])
+        ball.dx, ball.dy = float(self.dx[index]), float(self.dy[index])
+        ball.speed = float(self.speed[index])
+
+    def keep(self, mask):
+        """
+        Method for dropping every ball whose entry in mask is False, keeping the rest in order
+
+        Parameters:
+        mask: numpy.ndarray of bool
+        """
+        self.count = keep((self.x, self.y, self.dx, self.dy, self.speed, self.previous_x, self.previous_y),
+                          self.count, mask)
+
+    def save_positions(self):
+        """
+        Method for remembering every ball's position before a tick, so frames can be drawn between ticks
+        """
+        self.previous_x[:self.count] = self.x[:self.count]
+        self.previous_y[:self.count] = self.y[:self.count]
+
+    def positions(self, interpolation):
+        """
+        Method for listing the top-left drawing position of every ball, part way between the last two ticks
+
+        Parameters:
+        interpolation: float
+        """
+        count = self.count
+        x = self.previous_x[:count] + (self.x[:count] - self.previous_x[:count]) * interpolation - self.radius
+        y = self.previous_y[:count] + (self.y[:count] - self.previous_y[:count]) * interpolation - self.radius
+        return np.stack((x, y), axis=1).round().astype(int).tolist()
+
+    def tick(self, simulation):
+        """
+        Method for moving every extra ball through one tick of the simulation and bouncing them
+
+        Destroyed blocks are added to the simulation's score and last_hits, and balls that reach the bottom are dropped
+
+        Parameters:
+        simulation: BreakoutSimulation
+        """
+        if not self.count:
+            return
+        block_grid = simulation.block_grid
+        if self.block_arrays is None or self.block_arrays.blocks is not block_grid.blocks:
+            self.block_arrays = BlockArrays(block_grid)
+
+        # Split the tick so no ball moves further than its radius in one go
+        count = self.count
+        longest = float((self.speed[:count] * np.hypot(self.dx[:count], self.dy[:count])).max()) * simulation.time_step
+        substeps = max(1, math.ceil(longest / self.radius))
+        for _ in range(substeps):
+            if not self.count:
+                break
+            self.substep(simulation, self.speed[:self.count] * (simulation.time_step / substeps))
+
+    def substep(self, simulation, step):
+        """
+        Method for one movement and bounce pass over every extra ball
+
+        Parameters:
+        simulation: BreakoutSimulation
+        step: numpy.ndarray of distance per ball
+        """
+        count = self.count
+        radius = self.radius
+        x, y, dx, dy = self.x[:count], self.y[:count], self.dx[:count], self.dy[:count]
+        paddle = simulation.paddle
+        x += step * dx
+        y += step * dy
+
+        bounce_off_walls(x, y, dx, dy, radius, simulation.width)
+
+        left, top = x - radius, y - radius
+        right, bottom = x + radius, y + radius
+
+        # Check collision with paddle, steering the balls in the paddle's direction
+        hit_paddle = ((dy > 0) & (left < paddle.x + paddle.width) & (right > paddle.x)
+                      & (top < paddle.y + paddle.height) & (bottom > paddle.y))
+        if hit_paddle.any():
+            if simulation.paddle_moving_direction == "left":
+                np.copyto(dx, -np.abs(dx), where=hit_paddle)
+            elif simulation.paddle_moving_direction == "right":
+                np.copyto(dx, np.abs(dx), where=hit_paddle)
+            np.copyto(dy, -np.abs(dy), where=hit_paddle)
+
+        self.collide_blocks(simulation, left, top, right, bottom)
+
+        # Balls that reach the bottom are lost
+        lost = bottom >= simulation.height
+        if lost.any():
+            self.keep(~lost)
+
+    def collide_blocks(self, simulation, left, top, right, bottom):
+        """
+        Method for bouncing balls off the first alive block each one overlaps and destroying those blocks
+
+        Parameters:
+        simulation: BreakoutSimulation
+        left: numpy.ndarray
+        top: numpy.ndarray
+        right: numpy.ndarray
+        bottom: numpy.ndarray
+        """
+        arrays = self.block_arrays
+        if not simulation.block_grid.remaining:
+            return
+        count = self.count
+
+        # Gather the blocks of every cell each ball covers
+        first_column = np.floor((left - arrays.origin_x) / arrays.cell_width).astype(np.int64)
+        first_row = np.floor((top - arrays.origin_y) / arrays.cell_height).astype(np.int64)
+        span_x = int(math.ceil(2 * self.radius / arrays.cell_width)) + 1
+        span_y = int(math.ceil(2 * self.radius / arrays.cell_height)) + 1
+        offsets_x, offsets_y = np.meshgrid(np.arange(span_x), np.arange(span_y))
+        columns = first_column[:, None] + offsets_x.ravel()
+        rows = first_row[:, None] + offsets_y.ravel()
+        inside = (columns >= 0) & (columns < arrays.columns) & (rows >= 0) & (rows < arrays.rows)
+        candidates = arrays.cells[np.where(inside, rows * arrays.columns + columns, 0)]
+        candidates = np.where(inside[:, :, None], candidates, -1).reshape(count, -1)
+
+        # Keep the lowest index alive block that each ball overlaps, like the scalar scan
+        index = np.maximum(candidates, 0)
+        overlap = ((candidates >= 0) & (arrays.alive[index] > 0)
+                   & (left[:, None] < arrays.right[index]) & (right[:, None] > arrays.left[index])
+                   & (top[:, None] < arrays.bottom[index]) & (bottom[:, None] > arrays.top[index]))
+        balls = np.flatnonzero(overlap.any(axis=1))
+        if not len(balls):
+            return
+        hit = np.where(overlap[balls], index[balls], len(arrays.left)).min(axis=1)
+
+        dx, dy = self.dx[balls], self.dy[balls]
+        flip_x, flip_y = block_sides(dx, dy, (left[balls], top[balls], right[balls], bottom[balls]),
+                                     (arrays.left[hit], arrays.top[hit], arrays.right[hit], arrays.bottom[hit]))
+        self.dx[balls] = np.where(flip_x, -dx, dx)
+        self.dy[balls] = np.where(flip_y, -dy, dy)
+
+        # Several balls can reach the same block at once, it only loses one hit point
+        hit_blocks, first = np.unique(hit, return_index=True)
+        for block, ball in zip(hit_blocks.tolist(), first.tolist()):
+            if not simulation.block_grid.hit(block):
+                continue
+            simulation.P1_score += 1
+            if flip_x[ball] and flip_y[ball]:
+                face = "corner"
+            elif flip_x[ball]:
+                face = "left" if dx[ball] > 0 else "right"
+            else:
+                face = "top" if dy[ball] > 0 else "bottom"
+            simulation.last_hits.append((block, face))
@@ -0,0 +1,571 @@
+import argparse
+import asyncio
+import struct
+import time
+from collections import OrderedDict, deque
+from random import Random
+import numpy as np
+from Replay import DIRECTION_CODES, DIRECTIONS, MODIFIER_CODES, MODIFIERS
+from Simulation import FPS, BreakoutSimulation
+from Tournament import CONTROLLERS, make_controller
+
+# Ticks per second the server runs every room at, clients predict at the same rate
+TICK_RATE = 60
+PORT = 50007
+
+# Players per room, a room starts once every seat is taken
+SEATS = 2
+
+# Snapshots kept per player to delta against, and inputs resent in every input message in case some are lost
+HISTORY = 64
+INPUT_REDUNDANCY = 8
+
+# Longest queue of unplayed inputs the server keeps per player, older ones are dropped so latency can not build up
+MAX_QUEUED_INPUTS = 4
+
+# Ticks a finished room keeps sending its final snapshot before it is removed
+LINGER_TICKS = TICK_RATE
+
+# Seconds between JOIN messages while a client waits to be welcomed and for its room to start, and the longest it
+# waits to be welcomed
+JOIN_INTERVAL = 0.5
+JOIN_TIMEOUT = 10
+
+# Seconds without a message before the server gives up on a player, or a client stops waiting for the server
+QUIET_TIMEOUT = 5
+
+# Message types and layouts
+JOIN, WELCOME, INPUT, SNAPSHOT = range(4)
+JOIN_MESSAGE = struct.Struct("<BIB")
+WELCOME_MESSAGE = struct.Struct("<BIBQB")
+INPUT_MESSAGE = struct.Struct("<BIIB")
+SNAPSHOT_MESSAGE = struct.Struct("<BIIIHI")
+REFUSED = 255
+
+# Values sent in a snapshot, each only sent when it differs from the baseline the client already has
+FIELDS = ["ball_x", "ball_y", "ball_dx", "ball_dy", "ball_speed", "paddle_x", "paddle_speed", "score",
+          "game_over", "opponent_score", "opponent_game_over"]
+
+def snapshot_fields(simulation, opponent=None):
+    """
+    Function for the snapshot values of a simulation, in the order of FIELDS
+
+    Parameters:
+    simulation: BreakoutSimulation
+    opponent: BreakoutSimulation
+    """
+    ball, paddle = simulation.ball, simulation.paddle
+    return (ball.x, ball.y, ball.dx, ball.dy, ball.speed, paddle.x, paddle.speed, simulation.P1_score,
+            simulation.game_over, opponent.P1_score if opponent is not None else 0,
+            opponent.game_over if opponent is not None else False)
+
+def encode_snapshot(tick, acknowledged, fields, alive, baseline_tick=0, baseline=None):
+    """
+    Function for packing a snapshot as a delta from a baseline snapshot the client has acknowledged
+
+    Only fields that changed are sent, marked in a bitmask, followed by the indices of blocks whose alive
+    bit flipped. Baseline tick 0 means the start of the game: no fields known and every block alive
+
+    Parameters:
+    tick: int
+    acknowledged: int, the last input sequence number played
+    fields: tuple of FIELDS values
+    alive: bytes
+    baseline_tick: int
+    baseline: (fields, alive) of the baseline snapshot
+    """
+    if baseline is None:
+        baseline_tick = 0
+        mask = (1 << len(FIELDS)) - 1
+        changed = np.flatnonzero(np.frombuffer(alive, dtype=np.uint8) == 0)
+    else:
+        baseline_fields, baseline_alive = baseline
+        mask = 0
+        for bit, (value, old) in enumerate(zip(fields, baseline_fields)):
+            if value != old:
+                mask |= 1 << bit
+        changed = np.flatnonzero(np.frombuffer(alive, dtype=np.uint8) != np.frombuffer(baseline_alive, dtype=np.uint8))
+    values = [value for bit, value in enumerate(fields) if mask >> bit & 1]
+    return b"".join((SNAPSHOT_MESSAGE.pack(SNAPSHOT, tick, baseline_tick, acknowledged, mask, len(changed)),
+                     struct.pack(f"<{len(values)}d", *values), changed.astype("<u4").tobytes()))
+
+def decode_snapshot(data, baselines, block_count):
+    """
+    Function for unpacking a snapshot against the client's stored snapshots, returns (tick, acknowledged, fields, alive),
+    or None if the baseline is no longer stored
+
+    Parameters:
+    data: bytes
+    baselines: dict of tick to (fields, alive)
+    block_count: int
+    """
+    _, tick, baseline_tick, acknowledged, mask, changes = SNAPSHOT_MESSAGE.unpack_from(data)
+    if baseline_tick == 0:
+        fields, alive = [0.0] * len(FIELDS), bytearray(b"\x01") * block_count
+    elif baseline_tick in baselines:
+        fields, alive = list(baselines[baseline_tick][0]), bytearray(baselines[baseline_tick][1])
+    else:
+        return None
+    bits = [bit for bit in range(len(FIELDS)) if mask >> bit & 1]
+    offset = SNAPSHOT_MESSAGE.size
+    for bit, value in zip(bits, struct.unpack_from(f"<{len(bits)}d", data, offset)):
+        fields[bit] = value
+    offset += 8 * len(bits)
+    for index in struct.unpack_from(f"<{changes}I", data, offset):
+        alive[index] ^= 1
+    return tick, acknowledged, tuple(fields), bytes(alive)
+
+def apply_snapshot(simulation, fields, alive):
+    """
+    Function for setting a simulation to the state in a snapshot
+
+    Parameters:
+    simulation: BreakoutSimulation
+    fields: tuple of FIELDS values
+    alive: bytes
+    """
+    ball, paddle, block_grid = simulation.ball, simulation.paddle, simulation.block_grid
+    ball.x, ball.y, ball.dx, ball.dy, ball.speed, paddle.x, paddle.speed, score, game_over, _, _ = fields
+    simulation.P1_score = int(score)
+    simulation.game_over = bool(game_over)
+
+    # Blocks the prediction got wrong come back with one hit point or go to none, hit points are not sent
+    predicted = np.frombuffer(block_grid.alive, dtype=np.uint8)
+    for index in np.flatnonzero(predicted != np.frombuffer(alive, dtype=np.uint8)).tolist():
+        block_grid.hit_points[index] = alive[index]
+    block_grid.alive[:] = alive
+    block_grid.remaining = sum(alive)
+
+class Player:
+    """
+    Class for one seat in a room: its authoritative simulation, queued inputs and the snapshots sent to it
+
+    Parameters:
+    address: (str, int)
+    simulation: BreakoutSimulation
+    """
+    def __init__(self, address, simulation):
+        self.address = address
+        self.simulation = simulation
+        self.inputs = deque()
+        self.direction = None
+        self.sequence = 0
+        self.played = 0
+        self.acknowledged_tick = 0
+        self.history = OrderedDict()
+        self.heard = time.monotonic()
+
+    def receive_inputs(self, sequence, directions):
+        """
+        Method for queueing the inputs in a message that have not been seen before
+
+        Parameters:
+        sequence: int, the sequence number of the last direction
+        directions: bytes of direction codes, oldest first
+        """
+        first = sequence - len(directions) + 1
+        for number, code in enumerate(directions, first):
+            if number > self.sequence:
+                self.inputs.append((number, DIRECTIONS.get(code)))
+        self.sequence = max(self.sequence, sequence)
+        while len(self.inputs) > MAX_QUEUED_INPUTS:
+            self.played = self.inputs.popleft()[0]
+
+class Room:
+    """
+    Class for a room of players each playing the same seeded board, the higher score wins once every game is over
+
+    Parameters:
+    seed: int
+    modifier: str
+    """
+    def __init__(self, seed, modifier=None):
+        self.seed = seed
+        self.modifier = modifier
+        self.players = []
+        self.tick_count = 0
+        self.linger = LINGER_TICKS
+
+    def join(self, address):
+        """
+        Method for seating a player, returns the seat number or None if the room is full
+
+        Parameters:
+        address: (str, int)
+        """
+        if len(self.players) >= SEATS:
+            return None
+        simulation = BreakoutSimulation(modifier=self.modifier, time_step=FPS / TICK_RATE, rng=Random(self.seed))
+        self.players.append(Player(address, simulation))
+        return len(self.players) - 1
+
+    @property
+    def started(self):
+        return len(self.players) == SEATS
+
+    @property
+    def finished(self):
+        return self.started and all(player.simulation.game_over for player in self.players)
+
+    def tick(self):
+        """
+        Method for playing one tick of every game, each with the player's next queued input or their last direction
+        """
+        self.tick_count += 1
+        for player in self.players:
+            if player.inputs:
+                player.played, player.direction = player.inputs.popleft()
+            player.simulation.step(player.direction)
+        if self.finished:
+            self.linger -= 1
+
+    def snapshot(self, seat):
+        """
+        Method for recording and encoding the current snapshot for a seat, delta from the last one it acknowledged
+
+        Parameters:
+        seat: int
+        """
+        player = self.players[seat]
+        opponent = self.players[1 - seat].simulation if len(self.players) > 1 else None
+        fields = snapshot_fields(player.simulation, opponent)
+        alive = bytes(player.simulation.block_grid.alive)
+        player.history[self.tick_count] = (fields, alive)
+        while len(player.history) > HISTORY:
+            player.history.popitem(last=False)
+        baseline = player.history.get(player.acknowledged_tick)
+        return encode_snapshot(self.tick_count, player.played, fields, alive, player.acknowledged_tick, baseline)
+
+class GameServer(asyncio.DatagramProtocol):
+    """
+    Class for the authoritative server, running every room at TICK_RATE and sending each player a snapshot per tick
+
+    Parameters:
+    seed: int
+    """
+    def __init__(self, seed=None):
+        self.rng = Random(seed)
+        self.rooms = {}
+        self.players = {}
+        self.transport = None
+        self.late_ticks = 0
+        self.bytes_sent = 0
+        self.dropped_players = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, address):
+        if not data:
+            return
+        if data[0] == JOIN and len(data) >= JOIN_MESSAGE.size:
+            _, room_id, modifier = JOIN_MESSAGE.unpack_from(data)
+            if address not in self.players:
+                room = self.rooms.get(room_id)
+                if room is None:
+                    room = self.rooms[room_id] = Room(self.rng.randrange(2 ** 63), MODIFIERS.get(modifier))
+                seat = room.join(address)
+                if seat is None:
+                    self.transport.sendto(WELCOME_MESSAGE.pack(WELCOME, room_id, REFUSED, 0, 0), address)
+                    return
+                self.players[address] = (room_id, seat)
+            room_id, seat = self.players[address]
+            room = self.rooms[room_id]
+            room.players[seat].heard = time.monotonic()
+            self.transport.sendto(WELCOME_MESSAGE.pack(WELCOME, room_id, seat, room.seed,
+                                                       MODIFIER_CODES[room.modifier]), address)
+        elif data[0] == INPUT and address in self.players and len(data) >= INPUT_MESSAGE.size:
+            _, sequence, acknowledged_tick, count = INPUT_MESSAGE.unpack_from(data)
+            room_id, seat = self.players[address]
+            player = self.rooms[room_id].players[seat]
+            player.heard = time.monotonic()
+            player.receive_inputs(sequence, data[INPUT_MESSAGE.size:INPUT_MESSAGE.size + count])
+            if acknowledged_tick in player.history:
+                player.acknowledged_tick = max(player.acknowledged_tick, acknowledged_tick)
+
+    def tick(self):
+        """
+        Method for ticking every started room and sending out snapshots, finished rooms are removed after lingering
+
+        A client sends JOIN until its room starts and then an input every tick until its game is over, so a player
+        quiet for QUIET_TIMEOUT has gone. A room still waiting for players is removed, in a started room the
+        player's game is ended where it stands and the opponent plays on
+        """
+        now = time.monotonic()
+        for room_id, room in list(self.rooms.items()):
+            for player in room.players:
+                if now - player.heard > QUIET_TIMEOUT and not player.simulation.game_over:
+                    self.dropped_players += 1
+                    player.simulation.game_over = True
+            if not room.started:
+                if any(player.simulation.game_over for player in room.players):
+                    self.remove(room_id)
+                continue
+            room.tick()
+            for seat, player in enumerate(room.players):
+                message = room.snapshot(seat)
+                self.bytes_sent += len(message)
+                self.transport.sendto(message, player.address)
+            if room.linger <= 0:
+                self.remove(room_id)
+
+    def remove(self, room_id):
+        """
+        Method for removing a room and forgetting its players, who can join again as new players
+
+        Parameters:
+        room_id: int
+        """
+        for player in self.rooms.pop(room_id).players:
+            del self.players[player.address]
+
+    async def serve(self, tick_rate=TICK_RATE):
+        """
+        Method for ticking at a fixed rate until cancelled, counting ticks that start late
+
+        Parameters:
+        tick_rate: int
+        """
+        loop = asyncio.get_running_loop()
+        interval = 1 / tick_rate
+        deadline = loop.time()
+        while True:
+            self.tick()
+            deadline += interval
+            delay = deadline - loop.time()
+            if delay < 0:
+                self.late_ticks += 1
+                deadline = loop.time()
+            await asyncio.sleep(max(0.0, delay))
+
+class GameClient(asyncio.DatagramProtocol):
+    """
+    Class for a client that predicts its own game from its inputs and reconciles with every new snapshot
+
+    On a snapshot the local game is set to the server's state and the inputs the server has not played yet
+    are played again on top of it
+
+    Parameters:
+    room_id: int
+    modifier: str
+    """
+    def __init__(self, room_id, modifier=None):
+        self.room_id = room_id
+        self.modifier = modifier
+        self.transport = None
+        self.welcome = asyncio.get_running_loop().create_future()
+        self.started = asyncio.Event()
+        self.simulation = None
+        self.seat = None
+        self.sequence = 0
+        self.pending = deque()
+        self.snapshots = OrderedDict()
+        self.latest_tick = 0
+        self.server_fields = None
+        self.heard = time.monotonic()
+        self.corrections = []
+        self.snapshot_bytes = 0
+        self.snapshot_count = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.send_join()
+
+    def send_join(self):
+        """
+        Method for asking the server for a seat in the room, the server welcomes a client it already seated again
+        """
+        self.transport.sendto(JOIN_MESSAGE.pack(JOIN, self.room_id, MODIFIER_CODES[self.modifier]))
+
+    def datagram_received(self, data, address):
+        if not data:
+            return
+        if data[0] == WELCOME and not self.welcome.done():
+            _, _, seat, seed, modifier = WELCOME_MESSAGE.unpack_from(data)
+            if seat == REFUSED:
+                self.welcome.set_exception(ConnectionRefusedError(f"room {self.room_id} is full"))
+                return
+            self.seat = seat
+            self.simulation = BreakoutSimulation(modifier=MODIFIERS.get(modifier), time_step=FPS / TICK_RATE,
+                                                 rng=Random(seed))
+            self.welcome.set_result(seat)
+        elif data[0] == SNAPSHOT and self.simulation is not None:
+            self.receive_snapshot(data)
+
+    def receive_snapshot(self, data):
+        """
+        Method for decoding a snapshot and reconciling the predicted game with it, old and duplicate snapshots are ignored
+
+        Parameters:
+        data: bytes
+        """
+        snapshot = decode_snapshot(data, self.snapshots, len(self.simulation.block_grid.alive))
+        if snapshot is None or snapshot[0] <= self.latest_tick:
+            return
+        tick, acknowledged, fields, alive = snapshot
+        self.snapshot_bytes += len(data)
+        self.snapshot_count += 1
+        self.latest_tick = tick
+        self.heard = time.monotonic()
+        self.server_fields = fields
+        self.snapshots[tick] = (fields, alive)
+        while len(self.snapshots) > HISTORY:
+            self.snapshots.popitem(last=False)
+
+        # Rewind to the server's state and play the unacknowledged inputs again
+        simulation = self.simulation
+        predicted = (simulation.ball.x, simulation.ball.y)
+        apply_snapshot(simulation, fields, alive)
+        while self.pending and self.pending[0][0] <= acknowledged:
+            self.pending.popleft()
+        for _, direction in self.pending:
+            simulation.step(direction)
+        self.corrections.append(((simulation.ball.x - predicted[0]) ** 2 + (simulation.ball.y - predicted[1]) ** 2) ** 0.5)
+        self.started.set()
+
+    def send_input(self, direction):
+        """
+        Method for playing a direction locally and sending it, along with the last few, to the server
+
+        Parameters:
+        direction: str
+        """
+        self.sequence += 1
+        self.pending.append((self.sequence, direction))
+        self.simulation.step(direction)
+        directions = bytes(DIRECTION_CODES[direction] for _, direction in list(self.pending)[-INPUT_REDUNDANCY:])
+        self.transport.sendto(INPUT_MESSAGE.pack(INPUT, self.sequence, self.latest_tick, len(directions)) + directions)
+
+    @property
+    def finished(self):
+        fields = self.server_fields
+        return fields is not None and bool(fields[FIELDS.index("game_over")]) \
+            and bool(fields[FIELDS.index("opponent_game_over")])
+
+    async def keep_joining(self, waiting, timeout):
+        """
+        Method for waiting on a step of joining, sending JOIN again every JOIN_INTERVAL in case one was lost and so
+        the server knows this client is still there, raises TimeoutError after timeout seconds
+
+        Parameters:
+        waiting: awaitable
+        timeout: float, seconds
+        """
+        waiting = asyncio.ensure_future(waiting)
+        loop = asyncio.get_running_loop()
+        end = loop.time() + timeout
+        try:
+            while True:
+                done, _ = await asyncio.wait({waiting}, timeout=max(0.0, min(JOIN_INTERVAL, end - loop.time())))
+                if done:
+                    return waiting.result()
+                if loop.time() >= end:
+                    raise TimeoutError(f"no answer from the server for room {self.room_id} after {timeout}s")
+                self.send_join()
+        finally:
+            waiting.cancel()
+
+    async def join(self, timeout=JOIN_TIMEOUT):
+        """
+        Method for waiting until the server welcomes this client, returns the seat number
+
+        Parameters:
+        timeout: float, seconds
+        """
+        return await self.keep_joining(self.welcome, timeout)
+
+    async def play(self, controller, tick_rate=TICK_RATE, timeout=600):
+        """
+        Method for playing until the server reports both games over, returns the final (score, opponent score).
+        Once this player's game is over the client keeps listening until the opponent's game ends too. If the
+        server goes quiet for QUIET_TIMEOUT the last scores it sent are returned
+
+        Parameters:
+        controller: callable taking the predicted simulation and returning a direction
+        tick_rate: int
+        timeout: float, seconds, longest to wait for an opponent and then longest to play
+        """
+        await self.join()
+        await self.keep_joining(self.started.wait(), timeout)
+        loop = asyncio.get_running_loop()
+        end = loop.time() + timeout
+        while not self.finished and loop.time() < end and time.monotonic() - self.heard < QUIET_TIMEOUT:
+            if not self.simulation.game_over:
+                self.send_input(controller(self.simulation))
+            await asyncio.sleep(1 / tick_rate)
+        fields = self.server_fields
+        return int(fields[FIELDS.index("score")]), int(fields[FIELDS.index("opponent_score")])
+
+async def run_local(rooms, controllers, modifier=None, seed=0, seconds=600):
+    """
+    Function for running a server and two bot clients per room over localhost, printing each room's result,
+    the snapshot sizes and how far predictions were corrected
+
+    Parameters:
+    rooms: int
+    controllers: (str, str)
+    modifier: str
+    seed: int
+    seconds: float, longest a game may run
+    """
+    loop = asyncio.get_running_loop()
+    server_transport, server = await loop.create_datagram_endpoint(lambda: GameServer(seed), local_addr=("127.0.0.1", 0))
+    address = server_transport.get_extra_info("sockname")
+    serving = asyncio.ensure_future(server.serve())
+    clients = []
+    for room_id in range(1, rooms + 1):
+        for _ in range(SEATS):
+            _, client = await loop.create_datagram_endpoint(lambda: GameClient(room_id, modifier), remote_addr=address)
+            clients.append(client)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client.play(make_controller(controllers[index % SEATS]), timeout=seconds)
+                                     for index, client in enumerate(clients)))
+    elapsed = time.perf_counter() - start
+    serving.cancel()
+    for client in clients:
+        client.transport.close()
+    server_transport.close()
+
+    for room_id in range(rooms):
+        score1, score2 = results[SEATS * room_id][0], results[SEATS * room_id + 1][0]
+        print(f"room {room_id + 1}: {controllers[0]} {score1} - {score2} {controllers[1]}")
+    snapshots = sum(client.snapshot_count for client in clients)
+    corrections = sorted(correction for client in clients for correction in client.corrections)
+    print(f"{elapsed:.1f}s, {snapshots} snapshots averaging {sum(client.snapshot_bytes for client in clients) / snapshots:.1f} bytes,"
+          f" {server.late_ticks} late server ticks, {server.dropped_players} players dropped")
+    print(f"prediction corrections: median {corrections[len(corrections) // 2]:.2f}px, max {corrections[-1]:.2f}px")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Networked two-player Breakout over UDP")
+    commands = parser.add_subparsers(dest="command", required=True)
+    server_parser = commands.add_parser("server", help="run an authoritative server")
+    server_parser.add_argument("--host", default="0.0.0.0")
+    server_parser.add_argument("--port", type=int, default=PORT)
+    client_parser = commands.add_parser("client", help="join a room with a bot controller")
+    client_parser.add_argument("--host", default="127.0.0.1")
+    client_parser.add_argument("--port", type=int, default=PORT)
+    client_parser.add_argument("--room", type=int, default=1)
+    client_parser.add_argument("--controller", choices=list(CONTROLLERS), default="follow")
+    local_parser = commands.add_parser("local", help="run a server and bot clients over localhost")
+    local_parser.add_argument("--rooms", type=int, default=4)
+    local_parser.add_argument("--controllers", nargs=2, choices=list(CONTROLLERS), default=["follow", "lazy"])
+    local_parser.add_argument("--seconds", type=float, default=600, help="longest a game may run")
+    for command_parser in (client_parser, local_parser):
+        command_parser.add_argument("--modifier", choices=["speed"])
+    args = parser.parse_args()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        if args.command == "server":
+            _, server = await loop.create_datagram_endpoint(GameServer, local_addr=(args.host, args.port))
+            await server.serve()
+        elif args.command == "client":
+            transport, client = await loop.create_datagram_endpoint(lambda: GameClient(args.room, args.modifier),
+                                                                     remote_addr=(args.host, args.port))
+            print(f"seat {await client.join() + 1} in room {args.room}, waiting for the other player")
+            score, opponent_score = await client.play(make_controller(args.controller))
+            print(f"score {score}, opponent {opponent_score}")
+            transport.close()
+        else:
+            await run_local(args.rooms, args.controllers, args.modifier, seconds=args.seconds)
+    asyncio.run(main())
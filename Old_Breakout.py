@@ -1,8 +1,10 @@
+import argparse
 from random import randrange as rnd
 import pygame
+from Bot import landing_x
 
 
-def BreakoutMinigame(width, height):
+def BreakoutMinigame(width, height, bot_opponent=False):
     # Various game variables
     global fps
     running = True
@@ -45,7 +47,8 @@ def BreakoutMinigame(width, height):
         hit_index = 0
 
     # Variables for screen and clock
-    pygame.init()
+    pygame.display.init()
+    pygame.font.init()
     sc = pygame.display.set_mode((WIDTH, HEIGHT))
     clock = pygame.time.Clock()
     # Background image
@@ -56,6 +59,7 @@ def BreakoutMinigame(width, height):
     for k in range (2):
         global n
         n = 0
+        bot_direction = None
 
         # Makes sure the ball stays still at the start of each round, before changing the x and y values
         def moveBall(n):
@@ -123,27 +127,36 @@ def BreakoutMinigame(width, height):
                 elif k == 1:
                     P2_score += 1
                 dx, dy = detect_collision(dx, dy, ball, hit_rect)
-                # Increase ball speed
-                fps += 10
+                # Increase ball speed rather than the frame rate, 2 more pixels per frame matches 10 more frames per second
+                ball_speed += 2
 
             # Check win or game over conditions
             if ball.bottom > HEIGHT:
                 ResetScreen(ball, paddle)
                 k+=1
                 dx, dy = 1, -1
+                ball_speed = 6
                 break
             # Checks if all blocks on screen 
             elif not len(block_list):
                 ResetScreen(ball, paddle)
                 k+=1
                 dx, dy = 1, -1
+                ball_speed = 6
                 break
 
-            # Handle user input
+            # Handle user input, or let the bot play the second round
             key = pygame.key.get_pressed()
-            if (key[pygame.K_LEFT] or key[pygame.K_a]) and paddle.left > 0:
+            left, right = key[pygame.K_LEFT] or key[pygame.K_a], key[pygame.K_RIGHT] or key[pygame.K_d]
+            if bot_opponent and k == 1:
+                # The landing point is only projected again after the ball changes direction
+                if (dx, dy) != bot_direction:
+                    bot_direction = (dx, dy)
+                    bot_target = landing_x(ball.centerx, ball.centery, dx, dy, ball_radius, WIDTH, paddle.top - ball_rect // 2)
+                left, right = bot_target < paddle.centerx - paddle_speed, bot_target > paddle.centerx + paddle_speed
+            if left and paddle.left > 0:
                 paddle.left -= paddle_speed
-            if (key[pygame.K_RIGHT] or key[pygame.K_d]) and paddle.right < WIDTH:
+            if right and paddle.right < WIDTH:
                 paddle.right += paddle_speed
 
             # Update screen
@@ -177,10 +190,9 @@ def BreakoutMinigame(width, height):
 
             # Makes sure the game does not play unless spacebar is pressed
             while paused:
-                for event in pygame.event.get():
-                    if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                        paused = False
-                clock.tick(fps)
+                event = pygame.event.wait()  # Sleeps until the next event instead of polling
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                    paused = False
         
         # Second cycle of the loop
         elif k == 2:
@@ -220,11 +232,13 @@ def BreakoutMinigame(width, height):
 
             # Makes sure the game does progress further unless spacebar is pressed
             while paused:
-                for event in pygame.event.get():
-                    if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                        paused = False
-                clock.tick(fps)
+                event = pygame.event.wait()  # Sleeps until the next event instead of polling
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                    paused = False
             return player_win
 
 if __name__ == '__main__':
-    BreakoutMinigame(1200, 800)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Two-player Breakout Minigame")
+    parser.add_argument("--bot", action="store_true", help="let the predictive bot play as player 2")
+    args = parser.parse_args()
+    BreakoutMinigame(1200, 800, bot_opponent=args.bot)
\ No newline at end of file
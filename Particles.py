@@ -0,0 +1,154 @@
+import math
+import numpy as np
+import pygame
+from Arrays import keep
+
+# Most particles alive at once, and how many a destroyed block throws out at full quality
+MAX_PARTICLES = 32768
+BURST = 48
+
+# Particle lifetime and fall speed, in frames of the original game like the rest of the simulation
+LIFETIME = 24
+GRAVITY = 0.35
+
+# Lowest quality the pool drops to, as a fraction of BURST, and the quality below which particles are one pixel
+MIN_QUALITY = 0.1
+SMALL_QUALITY = 0.5
+
+class ParticlePool:
+    """
+    Class for brick debris, stored as one preallocated array per attribute and moved and drawn as whole arrays
+
+    Particles are kept oldest first, so dropping the oldest is a shift of every array. quality scales how many
+    particles a burst throws out and adapt lowers it whenever a frame runs over budget
+
+    Parameters:
+    capacity: int
+    seed: int
+    """
+    __slots__ = ("capacity", "count", "x", "y", "dx", "dy", "life", "color", "quality", "rng")
+
+    def __init__(self, capacity=MAX_PARTICLES, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.dx = np.zeros(capacity, dtype=np.float32)
+        self.dy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.uint32)
+        self.quality = 1.0
+        self.rng = np.random.default_rng(seed)
+
+    def clear(self):
+        """
+        Method for removing every particle
+        """
+        self.count = 0
+
+    def burst(self, rect, color):
+        """
+        Method for throwing debris out of a rect, as many particles as the quality allows and there is room for
+
+        Parameters:
+        rect: pygame.Rect
+        color: int, mapped to the surface the particles are drawn on
+        """
+        count = min(round(BURST * self.quality), self.capacity - self.count)
+        if count <= 0:
+            return
+        rng = self.rng
+        new = slice(self.count, self.count + count)
+        angle = rng.uniform(0, 2 * math.pi, count)
+        speed = rng.uniform(1, 6, count)
+        self.x[new] = rng.uniform(rect.left, rect.right, count)
+        self.y[new] = rng.uniform(rect.top, rect.bottom, count)
+        self.dx[new] = np.cos(angle) * speed
+        self.dy[new] = np.sin(angle) * speed - 2  # Kicked upwards a little before falling
+        self.life[new] = rng.uniform(0.5, 1, count) * LIFETIME
+        self.color[new] = color
+        self.count += count
+
+    def tick(self, time_step, width, height):
+        """
+        Method for moving every particle through one tick and dropping those that burn out or leave the screen
+
+        Parameters:
+        time_step: float
+        width: int
+        height: int
+        """
+        count = self.count
+        if not count:
+            return
+        x, y, dy, life = self.x[:count], self.y[:count], self.dy[:count], self.life[:count]
+        x += self.dx[:count] * time_step
+        y += dy * time_step
+        dy += GRAVITY * time_step
+        life -= time_step
+        alive = (life > 0) & (x >= 0) & (x < width) & (y < height)
+        if not alive.all():
+            self.keep(alive)
+
+    def keep(self, mask):
+        """
+        Method for dropping every particle whose entry in mask is False, keeping the rest in order
+
+        Parameters:
+        mask: numpy.ndarray of bool
+        """
+        self.count = keep((self.x, self.y, self.dx, self.dy, self.life, self.color), self.count, mask)
+
+    def drop_oldest(self, count):
+        """
+        Method for removing the given number of the oldest particles
+
+        Parameters:
+        count: int
+        """
+        kept = max(0, self.count - count)
+        for values in (self.x, self.y, self.dx, self.dy, self.life, self.color):
+            values[:kept] = values[self.count - kept:self.count]
+        self.count = kept
+
+    def draw(self, surface):
+        """
+        Method for writing every particle straight into the surface's pixels, returns the rect they cover or None
+
+        Parameters:
+        surface: pygame.Surface
+        """
+        if not self.count:
+            return None
+        size = 2 if self.quality >= SMALL_QUALITY else 1
+        width, height = surface.get_size()
+        x = self.x[:self.count].astype(np.intp)
+        y = self.y[:self.count].astype(np.intp)
+        inside = (x >= 0) & (y >= 0) & (x <= width - size) & (y <= height - size)
+        x, y, color = x[inside], y[inside], self.color[:self.count][inside]
+        if not len(x):
+            return None
+        pixels = pygame.surfarray.pixels2d(surface)
+        for offset_x in range(size):
+            for offset_y in range(size):
+                pixels[x + offset_x, y + offset_y] = color
+        del pixels  # Unlocks the surface
+        left, top = int(x.min()), int(y.min())
+        return pygame.Rect(left, top, int(x.max()) - left + size, int(y.max()) - top + size)
+
+    def adapt(self, frame_time, budget):
+        """
+        Method for lowering the quality after a frame that ran over budget, and raising it slowly while there is room
+
+        Once the quality is as low as it goes, the oldest quarter of the particles is dropped as well
+
+        Parameters:
+        frame_time: float, seconds
+        budget: float, seconds
+        """
+        if frame_time > budget:
+            if self.quality <= MIN_QUALITY:
+                self.drop_oldest(self.count // 4)
+            self.quality = max(MIN_QUALITY, self.quality * 0.7)
+        elif frame_time < budget / 2:
+            self.quality = min(1.0, self.quality + 0.02)
@@ -0,0 +1,139 @@
+import json
+from array import array
+from time import perf_counter
+import pygame
+
+# Game methods that are timed, with the names they are reported under
+PHASES = {
+    "handle_events": "handle_events",
+    "read_input": "read_input",
+    "handle_input": "handle_input",
+    "handle_collisions": "handle_collisions",
+    "blit_screen": "update_screen.blit",
+    "draw_screen": "update_screen.draw",
+    "flip_screen": "update_screen.flip",
+}
+
+class FrameProfiler:
+    """
+    Class for timing the phases of the game loop into fixed-size ring buffers
+
+    instrument wraps the game's phase methods on that one game object, so a game that is not being
+    profiled runs its normal methods with no timing code in the way
+
+    Parameters:
+    capacity: int
+    refresh_frames: int
+    """
+    def __init__(self, capacity=1024, refresh_frames=30):
+        self.capacity = capacity
+        self.refresh_frames = refresh_frames
+        self.origin = perf_counter()
+        self.starts = {}
+        self.durations = {}
+        self.counts = {}
+        self.frames = 0
+        self.overlay = []
+
+    def instrument(self, game):
+        """
+        Method for replacing the game's phase methods with timed versions
+
+        Parameters:
+        game: BreakoutGame
+        """
+        for method, phase in PHASES.items():
+            setattr(game, method, self.wrap(phase, getattr(game, method)))
+
+    def wrap(self, phase, function):
+        """
+        Method for making a version of function that records how long each call takes under the given phase
+
+        Parameters:
+        phase: str
+        function: callable
+        """
+        self.starts[phase] = array("d", bytes(8 * self.capacity))
+        self.durations[phase] = array("d", bytes(8 * self.capacity))
+        self.counts[phase] = 0
+        starts, durations, counts, capacity = self.starts[phase], self.durations[phase], self.counts, self.capacity
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            result = function(*args, **kwargs)
+            slot = counts[phase] % capacity
+            starts[slot] = start
+            durations[slot] = perf_counter() - start
+            counts[phase] += 1
+            return result
+        return timed
+
+    def samples(self, phase):
+        """
+        Method for listing the (start, duration) pairs held for a phase, oldest first
+
+        Parameters:
+        phase: str
+        """
+        count = self.counts[phase]
+        slots = range(count) if count <= self.capacity else [(count + i) % self.capacity for i in range(self.capacity)]
+        return [(self.starts[phase][slot], self.durations[phase][slot]) for slot in slots]
+
+    def percentiles(self, phase):
+        """
+        Method for getting the median and 99th percentile duration of a phase in milliseconds
+
+        Parameters:
+        phase: str
+        """
+        durations = sorted(duration for _, duration in self.samples(phase))
+        if not durations:
+            return 0.0, 0.0
+        last = len(durations) - 1
+        return durations[last // 2] * 1000, durations[last * 99 // 100] * 1000
+
+    def draw_overlay(self, screen, clock, assets):
+        """
+        Method for drawing p50/p99 per phase and the real frame rate, returns the rects drawn over
+
+        The numbers are only worked out every refresh_frames frames, so the text cache is not flooded
+
+        Parameters:
+        screen: pygame.Surface
+        clock: pygame.time.Clock
+        assets: AssetCache
+        """
+        if self.frames % self.refresh_frames == 0:
+            lines = [f"FPS {clock.get_fps():.1f}"]
+            for phase in self.counts:
+                p50, p99 = self.percentiles(phase)
+                lines.append(f"{phase}: p50 {p50:.3f} ms  p99 {p99:.3f} ms")
+            self.overlay = [assets.text(line, 20, pygame.Color('yellow')) for line in lines]
+        self.frames += 1
+
+        rects = []
+        y = screen.get_height() - 10 - 16 * len(self.overlay)
+        for text in self.overlay:
+            rects.append(screen.blit(text, (10, y)))
+            y += 16
+        return rects
+
+    def dump(self, path):
+        """
+        Method for writing every held sample to a file, Chrome trace JSON if the path ends in .json, otherwise CSV
+
+        Parameters:
+        path: str
+        """
+        samples = [(phase, (start - self.origin) * 1e6, duration * 1e6)
+                   for phase in self.counts for start, duration in self.samples(phase)]
+        samples.sort(key=lambda sample: sample[1])
+        with open(path, "w") as file:
+            if path.endswith(".json"):
+                events = [{"name": phase, "ph": "X", "ts": start, "dur": duration, "pid": 0, "tid": 0}
+                          for phase, start, duration in samples]
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+            else:
+                file.write("phase,start_us,duration_us\n")
+                for phase, start, duration in samples:
+                    file.write(f"{phase},{start:.1f},{duration:.1f}\n")
@@ -0,0 +1,139 @@
+import struct
+import sys
+import time
+from random import Random
+from Simulation import BreakoutSimulation
+
+# File layout: header, level path, paddle directions packed four ticks to a byte, then the hash of the final state
+MAGIC = b"BRKR"
+VERSION = 2
+HEADER = struct.Struct("<4sBBQdHHIH")
+HASH_SIZE = 16
+
+# Paddle directions and modifiers as small integers for packing
+DIRECTION_CODES = {None: 0, "left": 1, "right": 2}
+DIRECTIONS = {code: direction for direction, code in DIRECTION_CODES.items()}
+MODIFIER_CODES = {None: 0, "invisible": 1, "speed": 2, "multiball": 3}
+MODIFIERS = {code: modifier for modifier, code in MODIFIER_CODES.items()}
+
+class Recording:
+    """
+    Class for a recorded game: the seed and settings it started with, the paddle direction on every tick,
+    and a hash of the state it finished in
+
+    Parameters:
+    seed: int
+    modifier: str
+    time_step: float
+    width: int
+    height: int
+    level: str
+    """
+    def __init__(self, seed, modifier, time_step, width, height, level=None):
+        self.seed = seed
+        self.modifier = modifier
+        self.time_step = time_step
+        self.width = width
+        self.height = height
+        self.level = level
+        self.directions = bytearray()
+        self.final_hash = bytes(HASH_SIZE)
+
+    def record(self, direction):
+        """
+        Method for adding the paddle direction of one tick
+
+        Parameters:
+        direction: str
+        """
+        self.directions.append(DIRECTION_CODES[direction])
+
+    def finish(self, simulation):
+        """
+        Method for storing the hash of the state the recorded game finished in
+
+        Parameters:
+        simulation: BreakoutSimulation
+        """
+        self.final_hash = simulation.state_hash()
+
+    def save(self, path):
+        """
+        Method for writing the recording to a binary file
+
+        Parameters:
+        path: str
+        """
+        packed = bytearray((len(self.directions) + 3) // 4)
+        for tick, code in enumerate(self.directions):
+            packed[tick >> 2] |= code << ((tick & 3) * 2)
+        level = self.level.encode() if self.level is not None else b""
+        header = HEADER.pack(MAGIC, VERSION, MODIFIER_CODES[self.modifier], self.seed, self.time_step,
+                             self.width, self.height, len(self.directions), len(level))
+        with open(path, "wb") as file:
+            file.write(header + level + packed + self.final_hash)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Method for reading a recording written by save
+
+        Raises ValueError if the file is not a recording or is not the length its header describes
+
+        Parameters:
+        path: str
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path} is not a version {VERSION} Breakout recording")
+        magic, version, modifier, seed, time_step, width, height, ticks, level_size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or modifier not in MODIFIERS:
+            raise ValueError(f"{path} is not a version {VERSION} Breakout recording")
+        if len(data) != HEADER.size + level_size + (ticks + 3) // 4 + HASH_SIZE:
+            raise ValueError(f"{path} is the wrong length for a recording of {ticks} ticks")
+        level = data[HEADER.size:HEADER.size + level_size].decode() or None
+        recording = cls(seed, MODIFIERS[modifier], time_step, width, height, level)
+        start = HEADER.size + level_size
+        packed = data[start:start + (ticks + 3) // 4]
+        recording.directions = bytearray((packed[tick >> 2] >> ((tick & 3) * 2)) & 3 for tick in range(ticks))
+        if max(recording.directions, default=0) not in DIRECTIONS:
+            raise ValueError(f"{path} has a paddle direction that does not exist")
+        recording.final_hash = data[start + len(packed):]
+        return recording
+
+    def replay(self):
+        """
+        Method for running the recorded game again headless, as fast as possible, returns the finished simulation
+        """
+        simulation = BreakoutSimulation(self.width, self.height, self.modifier, self.time_step, Random(self.seed), self.level)
+        step = simulation.step
+        for code in self.directions:
+            step(DIRECTIONS[code])
+        return simulation
+
+    def verify(self):
+        """
+        Method for checking that replaying the game finishes in the recorded state
+        """
+        return self.replay().state_hash() == self.final_hash
+
+# Replays every recording given on the command line and fails if any of them ends differently
+if __name__ == '__main__':
+    failed = 0
+    ticks = 0
+    start = time.perf_counter()
+    for path in sys.argv[1:]:
+        try:
+            recording = Recording.load(path)
+        except ValueError as error:
+            print("Mismatch:", error)
+            failed += 1
+            continue
+        ticks += len(recording.directions)
+        if not recording.verify():
+            print("Mismatch:", path)
+            failed += 1
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {len(sys.argv) - 1} recordings, {ticks} ticks in {elapsed:.2f}s, {failed} mismatched")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,227 @@
+import time
+from Assets import pygame
+from Simulation import FPS
+
+# Longest frame time fed to the physics, in seconds
+MAX_FRAME_TIME = 0.25
+
+# Milliseconds an idle scene sleeps in pygame.event.wait before it wakes up with nothing to do
+IDLE_TIMEOUT = 1000
+
+# Frames per second a game drops to while its window is in the background
+UNFOCUSED_FPS = 10
+
+# Seconds the end screen stays up unless a key is pressed, and the keys that close it straight away
+END_SCREEN_TIME = 3.0
+END_SCREEN_KEYS = ("space", "return", "escape")
+
+class Scene:
+    """
+    Class for one screen of the game, run by a SceneManager
+
+    A scene with an idle_timeout sleeps in pygame.event.wait until an event arrives or idle_timeout milliseconds
+    pass, so it uses no CPU while nothing happens. A scene without one runs frame once per frame instead
+
+    No parameters
+    """
+    idle_timeout = None
+
+    def enter(self):
+        """
+        Method called when the scene becomes the current one
+        """
+
+    def handle_event(self, event):
+        """
+        Method for reacting to an event in an idle scene, returns the next scene, itself to stay, or None to stop
+
+        Parameters:
+        event: pygame.event.Event
+        """
+        return self
+
+    def timeout(self):
+        """
+        Method called when an idle scene's timeout passes with no events, returns the next scene like handle_event
+        """
+        return self
+
+    def frame(self):
+        """
+        Method for one frame of a scene that is not idle, reading its own events, returns the next scene like handle_event
+        """
+        return self
+
+class SceneManager:
+    """
+    Class for running scenes one after another until one returns None
+
+    No parameters
+    """
+    def run(self, scene):
+        """
+        Method for running from the given scene until a scene returns None
+
+        Parameters:
+        scene: Scene
+        """
+        scene.enter()
+        while scene is not None:
+            if scene.idle_timeout is not None:
+                # pygame waits forever for a timeout of 0, so never pass less than a millisecond
+                event = pygame.event.wait(max(1, scene.idle_timeout))
+                following = scene.timeout() if event.type == pygame.NOEVENT else scene.handle_event(event)
+            else:
+                following = scene.frame()
+            if following is not scene and following is not None:
+                following.enter()
+            scene = following
+
+class ModifierScene(Scene):
+    """
+    Class for the modifier choice shown before the game starts, sleeping until a key is pressed
+
+    Parameters:
+    game: BreakoutGame
+    """
+    idle_timeout = IDLE_TIMEOUT
+
+    def __init__(self, game):
+        self.game = game
+
+    def enter(self):
+        game = self.game
+        game.screen.fill((0, 0, 0))
+        lines = ["Choose a modifier:", "1. Ball gradually becomes invisible", "2. Ball speed increases with each hit",
+                 "3. Balls split into eight every 10 hits"]
+        for number, line in enumerate(lines):
+            text = game.assets.text(line, 36, pygame.Color('white'))
+            game.screen.blit(text, text.get_rect(center=(game.width // 2, game.height // 2 - 50 + 50 * number)))
+        pygame.display.flip()
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            modifier = {pygame.K_1: "invisible", pygame.K_2: "speed", pygame.K_3: "multiball"}.get(event.key)
+            if modifier is not None:
+                self.game.modifier = modifier
+                return None
+        elif event.type == pygame.QUIT:
+            self.game.modifier = "Shutdown"
+            return None
+        elif event.type == pygame.WINDOWEXPOSED:
+            pygame.display.flip()
+        return self
+
+class PlayScene(Scene):
+    """
+    Class for the game being played, with fixed physics ticks and a frame rate that drops while the window
+    is in the background. The game pauses while its window is minimized
+
+    Parameters:
+    game: BreakoutGame
+    """
+    def __init__(self, game):
+        self.game = game
+        self.accumulator = 0.0
+
+    @property
+    def fps(self):
+        return self.game.fps if self.game.focused else UNFOCUSED_FPS
+
+    def enter(self):
+        self.accumulator = 0.0
+        self.game.clock.tick()  # Time spent in other scenes is not played
+
+    def frame(self):
+        game = self.game
+        tick_length = 1 / game.physics_rate
+
+        # Time since the last frame is banked, capped so a long stall does not trigger a burst of ticks
+        self.accumulator += min(game.clock.tick(self.fps) / 1000, MAX_FRAME_TIME)
+        frame_start = time.perf_counter()
+        game.handle_events()
+        if not game.running:
+            return None
+        if game.minimized:
+            return PauseScene(game, self)
+
+        # Run as many fixed physics ticks as the banked time allows
+        while self.accumulator >= tick_length and not game.game_over:
+            game.save_positions()
+            game.handle_input(game.read_input())
+            game.handle_collisions()
+            self.accumulator -= tick_length
+        game.interpolation = min(1.0, self.accumulator / tick_length)
+        game.update_screen()
+        if game.particles is not None:
+            game.particles.adapt(time.perf_counter() - frame_start, 1 / (game.fps or FPS))
+
+        # Check if the ball hits the bottom of the screen or every block is destroyed
+        if game.game_over:
+            return EndScene(game)
+        return self
+
+class PauseScene(Scene):
+    """
+    Class for a game paused while its window is minimized, sleeping until the window comes back
+
+    Parameters:
+    game: BreakoutGame
+    play_scene: PlayScene
+    """
+    idle_timeout = IDLE_TIMEOUT
+
+    def __init__(self, game, play_scene):
+        self.game = game
+        self.play_scene = play_scene
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.game.running = False
+            return None
+        if event.type in (pygame.WINDOWRESTORED, pygame.WINDOWSHOWN, pygame.WINDOWFOCUSGAINED):
+            self.game.minimized = False
+            self.game.focused = True
+            self.game.static_layer = None  # Show a full frame again
+            return self.play_scene
+        return self
+
+class EndScene(Scene):
+    """
+    Class for the end screen with the final score, shown for END_SCREEN_TIME or until one of END_SCREEN_KEYS is pressed
+
+    Parameters:
+    game: BreakoutGame
+    """
+    def __init__(self, game):
+        self.game = game
+        self.deadline = 0
+
+    @property
+    def idle_timeout(self):
+        return round((self.deadline - time.perf_counter()) * 1000)
+
+    def enter(self):
+        game = self.game
+        game.screen.fill((0, 0, 0))
+        text = game.assets.text(f"Game Over! Blocks Destroyed: {game.P1_score}", 36, pygame.Color('white'))
+        game.screen.blit(text, text.get_rect(center=(game.width // 2, game.height // 2)))
+        pygame.display.flip()
+        self.deadline = time.perf_counter() + END_SCREEN_TIME
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT or event.type == pygame.KEYDOWN and pygame.key.name(event.key) in END_SCREEN_KEYS:
+            return self.finish()
+        if event.type == pygame.WINDOWEXPOSED:
+            pygame.display.flip()
+        return self
+
+    def timeout(self):
+        return self.finish() if time.perf_counter() >= self.deadline else self
+
+    def finish(self):
+        """
+        Method for ending the game once the end screen is done
+        """
+        self.game.running = False
+        return None
@@ -0,0 +1,583 @@
+import hashlib
+import struct
+from random import Random, randrange as rnd
+from Levels import load_level
+
+# Define game parameters
+HEIGHT = 800
+WIDTH = 1200
+FPS = 30
+
+class BlockGrid:
+    """
+    Class for the grid of breakable blocks, without any drawing code
+
+    Each block is an (x, y, width, height) tuple, which pygame accepts anywhere it takes a Rect.
+    Blocks are never moved in memory, destroyed blocks are cleared in an alive bitmap, and a uniform grid of
+    cells maps each cell to the blocks overlapping it so collisions only test the cells the ball is in
+
+    No parameters
+    """
+    def __init__(self):
+        # Setting block size
+        self.width = 100
+        self.height = 50
+        self.set_blocks([], [])
+
+    def createGrid(self, rng=None):
+        """
+        Method for making lists containing the positions and colors of each individual block in the grid
+
+        Parameters:
+        rng: random.Random
+        """
+        randrange = rng.randrange if rng is not None else rnd
+        blocks = [(10 + 120 * i, 10 + 70 * j, self.width, self.height) for i in range(10) for j in range(4)]
+        colors = [(randrange(30, 256), randrange(30, 256), randrange(30, 256)) for _ in range(len(blocks))]
+        self.set_blocks(blocks, colors)
+
+    def set_blocks(self, blocks, colors, hit_points=None):
+        """
+        Method for replacing every block and rebuilding the cell index
+
+        Parameters:
+        blocks: list of (x, y, width, height) tuples
+        colors: list of (r, g, b) tuples
+        hit_points: list of int, one hit per block if not given
+        """
+        self.blocks = list(blocks)
+        self.colors = list(colors)
+        self.alive = bytearray(b"\x01") * len(self.blocks)
+        self.hit_points = bytearray(hit_points) if hit_points is not None else bytearray(self.alive)
+        self.remaining = len(self.blocks)
+        self.build_index()
+
+    def build_index(self):
+        """
+        Method for sorting every block into the cells it overlaps, cells are as large as the largest block
+        """
+        self.cells = []
+        if not self.blocks:
+            self.origin_x = self.origin_y = 0
+            self.cell_width = self.cell_height = 1
+            self.columns = self.rows = 0
+            return
+        self.origin_x = min(x for x, _, _, _ in self.blocks)
+        self.origin_y = min(y for _, y, _, _ in self.blocks)
+        self.cell_width = max(width for _, _, width, _ in self.blocks) or 1
+        self.cell_height = max(height for _, _, _, height in self.blocks) or 1
+        self.columns = int(max(x + width for x, _, width, _ in self.blocks) - self.origin_x) // self.cell_width + 1
+        self.rows = int(max(y + height for _, y, _, height in self.blocks) - self.origin_y) // self.cell_height + 1
+
+        self.cells = [[] for _ in range(self.columns * self.rows)]
+        for index, (x, y, width, height) in enumerate(self.blocks):
+            first_column, last_column, first_row, last_row = self.cell_span(x, y, x + width, y + height)
+            for row in range(first_row, last_row + 1):
+                for column in range(first_column, last_column + 1):
+                    self.cells[row * self.columns + column].append(index)
+
+    def cell_span(self, left, top, right, bottom):
+        """
+        Method for finding the first and last column and row covered by a box, clamped to the grid
+
+        Parameters:
+        left: float
+        top: float
+        right: float
+        bottom: float
+        """
+        first_column = max(0, int((left - self.origin_x) // self.cell_width))
+        last_column = min(self.columns - 1, int((right - self.origin_x) // self.cell_width))
+        first_row = max(0, int((top - self.origin_y) // self.cell_height))
+        last_row = min(self.rows - 1, int((bottom - self.origin_y) // self.cell_height))
+        return first_column, last_column, first_row, last_row
+
+    def collide(self, left, top, right, bottom):
+        """
+        Method for finding the first alive block overlapping the given box, returns -1 if there is none
+
+        Only the cells covered by the box are tested, and the lowest index wins so the result is the
+        same as scanning the whole list in order. The game sweeps the ball with query instead, this is kept for
+        the collision and level benchmarks, which check the grid against pygame's collidelist
+
+        Parameters:
+        left: float
+        top: float
+        right: float
+        bottom: float
+        """
+        if not self.remaining:
+            return -1
+        origin_x, origin_y = self.origin_x, self.origin_y
+        cell_width, cell_height = self.cell_width, self.cell_height
+        first_row = max(0, int((top - origin_y) // cell_height))
+        last_row = min(self.rows - 1, int((bottom - origin_y) // cell_height))
+        if first_row > last_row:
+            return -1
+        first_column = max(0, int((left - origin_x) // cell_width))
+        last_column = min(self.columns - 1, int((right - origin_x) // cell_width))
+        blocks, alive, cells, columns = self.blocks, self.alive, self.cells, self.columns
+        hit_index = -1
+        for row in range(first_row * columns, last_row * columns + 1, columns):
+            for cell in cells[row + first_column:row + last_column + 1]:
+                for index in cell:
+                    if alive[index] and (hit_index == -1 or index < hit_index):
+                        x, y, width, height = blocks[index]
+                        if left < x + width and right > x and top < y + height and bottom > y:
+                            hit_index = index
+        return hit_index
+
+    def query(self, left, top, right, bottom):
+        """
+        Method for listing the alive blocks in the cells covered by the given box, each block at most once
+
+        Parameters:
+        left: float
+        top: float
+        right: float
+        bottom: float
+        """
+        if not self.remaining:
+            return []
+        first_column, last_column, first_row, last_row = self.cell_span(left, top, right, bottom)
+        alive, cells, columns = self.alive, self.cells, self.columns
+        found = set()
+        for row in range(first_row * columns, last_row * columns + 1, columns):
+            for cell in cells[row + first_column:row + last_column + 1]:
+                found.update(index for index in cell if alive[index])
+        return sorted(found)
+
+    def hit(self, index):
+        """
+        Method for taking one hit point off a block, returns True if that destroyed it
+
+        Parameters:
+        index: int
+        """
+        self.hit_points[index] -= 1
+        if self.hit_points[index]:
+            return False
+        self.pop(index)
+        return True
+
+    def pop(self, index):
+        """
+        Method for destroying a block, returns the destroyed block
+
+        Parameters:
+        index: int
+        """
+        self.alive[index] = 0
+        self.hit_points[index] = 0
+        self.remaining -= 1
+        return self.blocks[index]
+
+class Paddle:
+    """
+    Class for the paddle, position is stored as floats so speed increases are not rounded away
+
+    Parameters:
+    width: int
+    height: int
+    paddle_speed: int
+    screen_width: int
+    screen_height: int
+    """
+    def __init__(self, width, height, paddle_speed, screen_width=WIDTH, screen_height=HEIGHT):
+        self.width = width
+        self.height = height
+        self.speed = paddle_speed
+        self.screen_width = screen_width
+        self.x = screen_width // 2 - width // 2
+        self.y = screen_height - height - 10
+
+    def move(self, direction, time_step=1):
+        """
+        Method for moving the paddle left and right and ensuring it is inside the playable area
+
+        Parameters:
+        direction: str
+        time_step: float
+        """
+        if direction == "left" and self.x > 0:
+            self.x -= self.speed * time_step
+        elif direction == "right" and self.x + self.width < self.screen_width:
+            self.x += self.speed * time_step
+
+class Ball:
+    """
+    Class for the ball, position is the center of the ball
+
+    Parameters:
+    radius: int
+    speed: int
+    screen_width: int
+    screen_height: int
+    rng: random.Random
+    """
+    def __init__(self, radius, speed, screen_width=WIDTH, screen_height=HEIGHT, rng=None):
+        self.radius = radius
+        self.speed = speed
+        self.x = (rng.randrange if rng is not None else rnd)(radius, screen_width - radius)
+        self.y = screen_height // 2
+        self.dx = 1
+        self.dy = -1
+
+    def move(self, time_step=1):
+        """
+        Method for moving the ball across the x and y
+
+        Parameters:
+        time_step: float
+        """
+        self.x += self.speed * self.dx * time_step
+        self.y += self.speed * self.dy * time_step
+
+# Normals of the faces a ball can hit, as seen from the block
+FACES = {(-1, 0): "left", (1, 0): "right", (0, -1): "top", (0, 1): "bottom"}
+
+# Blocks destroyed between each split of the balls in multi-ball play
+SPLIT_EVERY = 10
+
+# Most bounces resolved within a single tick, stops a ball wedged between objects from looping forever
+MAX_BOUNCES = 8
+
+def sweep_circle_box(x, y, vx, vy, radius, left, top, right, bottom):
+    """
+    Function for finding when a circle moving from (x, y) by (vx, vy) first touches a box
+
+    Returns (time, normal_x, normal_y) with time between 0 and 1 and the normal pointing out of the hit face,
+    or None if the circle does not touch the box while moving towards it.
+    The box grown by the radius has flat faces and rounded corners, so the flat faces and the four corner
+    circles are tested separately and the earliest contact wins
+
+    Parameters:
+    x: float
+    y: float
+    vx: float
+    vy: float
+    radius: float
+    left: float
+    top: float
+    right: float
+    bottom: float
+    """
+    # A circle already overlapping the box is hit straight away if it is moving further in
+    closest_x = min(max(x, left), right)
+    closest_y = min(max(y, top), bottom)
+    offset_x, offset_y = x - closest_x, y - closest_y
+    if offset_x * offset_x + offset_y * offset_y < radius * radius:
+        if offset_x or offset_y:
+            length = (offset_x * offset_x + offset_y * offset_y) ** 0.5
+            normal_x, normal_y = offset_x / length, offset_y / length
+        elif abs(vx) > abs(vy):
+            normal_x, normal_y = (-1 if vx > 0 else 1), 0
+        else:
+            normal_x, normal_y = 0, (-1 if vy > 0 else 1)
+        if vx * normal_x + vy * normal_y < 0:
+            return 0.0, normal_x, normal_y
+        return None
+
+    best = None
+
+    # Flat faces, the box grown by the radius along one axis only
+    if vx > 0:
+        time = (left - radius - x) / vx
+        if 0 <= time <= 1 and top <= y + vy * time <= bottom:
+            best = (time, -1, 0)
+    elif vx < 0:
+        time = (right + radius - x) / vx
+        if 0 <= time <= 1 and top <= y + vy * time <= bottom:
+            best = (time, 1, 0)
+    if vy > 0:
+        time = (top - radius - y) / vy
+        if 0 <= time <= 1 and left <= x + vx * time <= right and (best is None or time < best[0]):
+            best = (time, 0, -1)
+    elif vy < 0:
+        time = (bottom + radius - y) / vy
+        if 0 <= time <= 1 and left <= x + vx * time <= right and (best is None or time < best[0]):
+            best = (time, 0, 1)
+    if best is not None:
+        return best
+
+    # Rounded corners, solving |position + velocity * time - corner| = radius for the first time
+    a = vx * vx + vy * vy
+    if not a:
+        return None
+    for corner_x in (left, right):
+        for corner_y in (top, bottom):
+            offset_x, offset_y = x - corner_x, y - corner_y
+            b = offset_x * vx + offset_y * vy
+            if b >= 0:
+                continue  # Moving away from this corner
+            c = offset_x * offset_x + offset_y * offset_y - radius * radius
+            discriminant = b * b - a * c
+            if discriminant < 0:
+                continue
+            time = (-b - discriminant ** 0.5) / a
+            if 0 <= time <= 1 and (best is None or time < best[0]):
+                best = (time, (offset_x + vx * time) / radius, (offset_y + vy * time) / radius)
+    return best
+
+def sweep_walls(x, y, vx, vy, radius, width):
+    """
+    Function for finding when a circle moving from (x, y) by (vx, vy) first reaches the left, right or top wall
+
+    Returns (time, normal_x, normal_y) like sweep_circle_box, or None if it reaches no wall during the move.
+    A circle already past a wall is hit at time 0, so it always bounces back into the playable area
+
+    Parameters:
+    x: float
+    y: float
+    vx: float
+    vy: float
+    radius: float
+    width: float
+    """
+    best = None
+    if vx < 0:
+        best = (max(0.0, (radius - x) / vx), 1, 0)
+    elif vx > 0:
+        best = (max(0.0, (width - radius - x) / vx), -1, 0)
+    if vy < 0:
+        time = max(0.0, (radius - y) / vy)
+        if best is None or time < best[0]:
+            best = (time, 0, 1)
+    if best is not None and best[0] < 1.0:
+        return best
+    return None
+
+def face_name(normal_x, normal_y):
+    """
+    Function for naming the face of a block with the given outward normal, "corner" for a rounded corner
+
+    Parameters:
+    normal_x: float
+    normal_y: float
+    """
+    return FACES.get((normal_x, normal_y), "corner")
+
+class BreakoutSimulation:
+    """
+    Class for the game rules, with no display, event pump or frame cap
+
+    One call to step advances the game by a fixed number of ticks, so it can be run as fast as the CPU allows
+
+    A tick covers time_step frames of the original 30 FPS game, so larger time steps simulate more
+    game time per tick without the ball passing through anything.
+    All randomness comes from rng, so a game is fully decided by the rng's seed and the paddle inputs.
+    With a level path the blocks are loaded from that level file instead of the built-in grid
+
+    Parameters:
+    width: int
+    height: int
+    modifier: str
+    time_step: float
+    rng: random.Random
+    level: str
+    """
+    ball_class = Ball
+    paddle_class = Paddle
+    block_grid_class = BlockGrid
+
+    def __init__(self, width=WIDTH, height=HEIGHT, modifier=None, time_step=1, rng=None, level=None):
+        self.width = width
+        self.height = height
+        self.time_step = time_step
+        self.rng = rng if rng is not None else Random()
+        self.level = level
+        self.paddle_width = 300
+        self.paddle_height = 30
+        self.paddle_speed = 10
+        self.ball_speed = 5
+        self.modifier = modifier
+        self.P1_score = 0
+        self.paddle_moving_direction = None
+        self.game_over = False
+        self.last_hits = []
+        self.create_objects()
+
+    def create_objects(self):
+        """
+        Create instances of paddle, ball, and block grid
+        """
+        self.paddle = self.paddle_class(self.paddle_width, self.paddle_height, self.paddle_speed, self.width, self.height)
+        self.ball = self.ball_class(10, self.ball_speed, self.width, self.height, self.rng)
+        self.block_grid = self.block_grid_class()
+        if self.level is not None:
+            load_level(self.level, self.block_grid)
+        else:
+            self.block_grid.createGrid(self.rng)
+        self.balls = None
+        self.next_split = SPLIT_EVERY
+        self.game_over = False
+
+    def reset(self, modifier=None):
+        """
+        Reset the objects, score and modifier to the start of a new game
+
+        Parameters:
+        modifier: str
+        """
+        self.modifier = modifier
+        self.P1_score = 0
+        self.paddle_moving_direction = None
+        self.create_objects()
+
+    def handle_input(self, direction):
+        """
+        Move the paddle in the given direction, None keeps it still
+
+        Parameters:
+        direction: str
+        """
+        if direction is not None:
+            self.paddle.move(direction, self.time_step)
+        self.paddle_moving_direction = direction
+
+    def handle_collisions(self):
+        """
+        Handle collisions of the ball with walls, paddle, and blocks
+
+        The ball is swept along its path for the tick, stopping at the earliest contact, bouncing and
+        carrying on with the time that is left, so fast balls can not pass through blocks or the paddle.
+        Blocks destroyed during the tick are listed in last_hits as (index, face) pairs
+        """
+        ball = self.ball
+        paddle = self.paddle
+        block_grid = self.block_grid
+        radius = ball.radius
+        self.last_hits = []
+        remaining = 1.0
+
+        for _ in range(MAX_BOUNCES):
+            vx = ball.speed * ball.dx * self.time_step * remaining
+            vy = ball.speed * ball.dy * self.time_step * remaining
+            hit_time, hit_normal, hit_object = 1.0, None, None
+
+            # Check collisions with walls
+            hit = sweep_walls(ball.x, ball.y, vx, vy, radius, self.width)
+            if hit is not None:
+                hit_time, hit_normal, hit_object = hit[0], hit[1:], "wall"
+
+            # Check collision with paddle, only while the ball is falling
+            if vy > 0:
+                hit = sweep_circle_box(ball.x, ball.y, vx, vy, radius, paddle.x, paddle.y,
+                                       paddle.x + paddle.width, paddle.y + paddle.height)
+                if hit is not None and hit[0] < hit_time:
+                    hit_time, hit_normal, hit_object = hit[0], hit[1:], "paddle"
+
+            # Check collision with the blocks in the cells along the ball's path
+            end_x, end_y = ball.x + vx, ball.y + vy
+            for index in block_grid.query(min(ball.x, end_x) - radius, min(ball.y, end_y) - radius,
+                                          max(ball.x, end_x) + radius, max(ball.y, end_y) + radius):
+                x, y, width, height = block_grid.blocks[index]
+                hit = sweep_circle_box(ball.x, ball.y, vx, vy, radius, x, y, x + width, y + height)
+                if hit is not None and hit[0] < hit_time:
+                    hit_time, hit_normal, hit_object = hit[0], hit[1:], index
+
+            # Move up to the first contact, or all the way if nothing is in the way
+            ball.x += vx * hit_time
+            ball.y += vy * hit_time
+            if hit_object is None:
+                break
+            remaining *= 1 - hit_time
+
+            if hit_object == "paddle":
+                # Adjust ball's horizontal velocity based on paddle's movement direction
+                if self.paddle_moving_direction == "left":
+                    ball.dx = -abs(ball.dx)
+                elif self.paddle_moving_direction == "right":
+                    ball.dx = abs(ball.dx)
+                ball.dy = -abs(ball.dy)
+                continue
+
+            # Reflect every part of the velocity that points into the hit face
+            normal_x, normal_y = hit_normal
+            if ball.dx * normal_x < 0:
+                ball.dx = -ball.dx
+            if ball.dy * normal_y < 0:
+                ball.dy = -ball.dy
+
+            if hit_object != "wall" and block_grid.hit(hit_object):
+                self.last_hits.append((hit_object, face_name(normal_x, normal_y)))
+                self.P1_score += 1
+
+                if self.modifier == "speed":
+                    # Increase ball and paddle speed based on the number of blocks hit
+                    ball.speed += 0.1 * self.P1_score
+                    paddle.speed += 0.1 * self.P1_score
+
+        # Extra balls from multi-ball play move as one batch, and one takes over if the main ball is lost
+        if self.balls is not None:
+            self.balls.tick(self)
+            if ball.y + radius >= self.height and self.balls.count:
+                self.balls.promote(ball)
+        if self.modifier == "multiball" and self.P1_score >= self.next_split:
+            self.next_split += SPLIT_EVERY
+            self.split_balls()
+
+        # The game ends when the ball reaches the bottom or every block is gone
+        if ball.y + radius >= self.height or not block_grid.remaining:
+            self.game_over = True
+
+    def split_balls(self):
+        """
+        Split every ball in play into eight, up to MultiBall.MAX_BALLS balls in total
+        """
+        from MultiBall import MAX_BALLS, BallStore  # NumPy is only needed once balls split
+        if self.balls is None:
+            self.balls = BallStore(self.ball.radius, MAX_BALLS - 1)
+        balls = self.balls
+        for index in range(balls.count):
+            balls.split(float(balls.x[index]), float(balls.y[index]), float(balls.speed[index]))
+        balls.split(self.ball.x, self.ball.y, self.ball.speed)
+
+    def state_hash(self):
+        """
+        Hash of everything that decides how the game carries on, for checking that two runs ended the same way
+        """
+        ball = self.ball
+        paddle = self.paddle
+        state = struct.pack("<5d2dq?", ball.x, ball.y, ball.dx, ball.dy, ball.speed,
+                            paddle.x, paddle.speed, self.P1_score, self.game_over)
+        if self.balls is not None:
+            count = self.balls.count
+            for values in (self.balls.x, self.balls.y, self.balls.dx, self.balls.dy, self.balls.speed):
+                state += values[:count].tobytes()
+        state += bytes(self.block_grid.alive) + bytes(self.block_grid.hit_points)
+        return hashlib.blake2b(state, digest_size=16).digest()
+
+    def step(self, action=None, n_ticks=1):
+        """
+        Advance the game by n_ticks with the paddle moving in the given direction, returns the number of blocks destroyed
+
+        Stops early if the game ends during the ticks
+
+        Parameters:
+        action: str
+        n_ticks: int
+        """
+        start_score = self.P1_score
+        for _ in range(n_ticks):
+            if self.game_over:
+                break
+            self.handle_input(action)
+            self.handle_collisions()
+        return self.P1_score - start_score
+
+# Runs a quick headless episode with a paddle that follows the ball
+if __name__ == '__main__':
+    simulation = BreakoutSimulation()
+    ticks = 0
+    while not simulation.game_over and ticks < 100000:
+        paddle_center = simulation.paddle.x + simulation.paddle.width / 2
+        if simulation.ball.x < paddle_center - 10:
+            direction = "left"
+        elif simulation.ball.x > paddle_center + 10:
+            direction = "right"
+        else:
+            direction = None
+        simulation.step(direction)
+        ticks += 1
+    print(f"Ticks: {ticks}, Blocks Destroyed: {simulation.P1_score}")
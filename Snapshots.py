@@ -0,0 +1,266 @@
+import struct
+from random import Random
+import numpy as np
+from Replay import DIRECTION_CODES, DIRECTIONS, MODIFIER_CODES, MODIFIERS
+from Simulation import BreakoutSimulation
+
+# Everything about a game that is not a block or an extra ball: the ball, paddle, score, next split, modifier,
+# paddle direction, game over, then the number of extra balls and of block entries that follow
+STATE = struct.Struct("<5d2dIIBB?HI")
+
+# Save file layout: header, level path, then one full snapshot
+MAGIC = b"BRKS"
+VERSION = 1
+SAVE_HEADER = struct.Struct("<4sBQHHH")
+
+# Seconds of play the rewind buffer keeps
+REWIND_SECONDS = 10
+
+# Maps hit points to the alive flag, so the alive bitmap is rebuilt with one bytes.translate
+ALIVE_TABLE = bytes([0]) + bytes([1]) * 255
+
+def state_values(simulation, extra_balls, block_entries):
+    """
+    Function for the values packed into STATE, in order
+
+    Parameters:
+    simulation: BreakoutSimulation
+    extra_balls: int
+    block_entries: int
+    """
+    ball, paddle = simulation.ball, simulation.paddle
+    return (ball.x, ball.y, ball.dx, ball.dy, ball.speed, paddle.x, paddle.speed, simulation.P1_score,
+            simulation.next_split, MODIFIER_CODES[simulation.modifier],
+            DIRECTION_CODES[simulation.paddle_moving_direction], simulation.game_over, extra_balls, block_entries)
+
+def pack_balls(simulation):
+    """
+    Function for packing the extra balls of multi-ball play, returns (count, bytes)
+
+    Parameters:
+    simulation: BreakoutSimulation
+    """
+    balls = simulation.balls
+    if balls is None or not balls.count:
+        return 0, b""
+    count = balls.count
+    return count, b"".join(values[:count].tobytes() for values in (balls.x, balls.y, balls.dx, balls.dy, balls.speed))
+
+def restore_state(simulation, data, offset=0):
+    """
+    Function for setting everything in a packed STATE, returns (extra balls, block entries)
+
+    Parameters:
+    simulation: BreakoutSimulation
+    data: bytes
+    offset: int
+    """
+    ball, paddle = simulation.ball, simulation.paddle
+    (ball.x, ball.y, ball.dx, ball.dy, ball.speed, paddle.x, paddle.speed, simulation.P1_score, simulation.next_split,
+     modifier, direction, simulation.game_over, extra_balls, block_entries) = STATE.unpack_from(data, offset)
+    simulation.modifier = MODIFIERS[modifier]
+    simulation.paddle_moving_direction = DIRECTIONS[direction]
+    simulation.last_hits = []
+    return extra_balls, block_entries
+
+def restore_balls(simulation, count, data, offset=0):
+    """
+    Function for setting the extra balls to count balls packed by pack_balls, returns the offset after them
+
+    Parameters:
+    simulation: BreakoutSimulation
+    count: int
+    data: bytes
+    offset: int
+    """
+    balls = simulation.balls
+    if count and balls is None:
+        from MultiBall import MAX_BALLS, BallStore  # NumPy is only needed once balls split
+        balls = simulation.balls = BallStore(simulation.ball.radius, MAX_BALLS - 1)
+    if balls is not None:
+        balls.count = count
+        for values in (balls.x, balls.y, balls.dx, balls.dy, balls.speed):
+            values[:count] = np.frombuffer(data, dtype=np.float64, count=count, offset=offset)
+            offset += 8 * count
+        balls.save_positions()
+    return offset
+
+def set_hit_points(block_grid, hit_points):
+    """
+    Function for giving every block the given hit points, in place so views of the alive bitmap stay valid
+
+    Parameters:
+    block_grid: Simulation.BlockGrid
+    hit_points: bytes
+    """
+    block_grid.hit_points[:] = hit_points
+    block_grid.alive[:] = block_grid.hit_points.translate(ALIVE_TABLE)
+    block_grid.remaining = len(block_grid.alive) - block_grid.alive.count(0)
+
+def capture(simulation):
+    """
+    Function for a full snapshot of a game, every block's hit points included, for save files and search bots
+
+    Parameters:
+    simulation: BreakoutSimulation
+    """
+    hit_points = simulation.block_grid.hit_points
+    count, balls = pack_balls(simulation)
+    return b"".join((STATE.pack(*state_values(simulation, count, len(hit_points))), balls, hit_points))
+
+def restore(simulation, snapshot):
+    """
+    Function for setting a game to a full snapshot taken by capture on the same board
+
+    Parameters:
+    simulation: BreakoutSimulation
+    snapshot: bytes
+    """
+    block_grid = simulation.block_grid
+    extra_balls, block_entries = restore_state(simulation, snapshot)
+    if block_entries != len(block_grid.blocks):
+        raise ValueError(f"snapshot has {block_entries} blocks, the board has {len(block_grid.blocks)}")
+    offset = restore_balls(simulation, extra_balls, snapshot, STATE.size)
+    set_hit_points(block_grid, snapshot[offset:offset + block_entries])
+
+def write_save(path, simulation, seed, level=None):
+    """
+    Function for saving a game to a file, along with the seed and level that rebuild its board
+
+    Parameters:
+    path: str
+    simulation: BreakoutSimulation
+    seed: int
+    level: str
+    """
+    level = level.encode() if level is not None else b""
+    header = SAVE_HEADER.pack(MAGIC, VERSION, seed, simulation.width, simulation.height, len(level))
+    with open(path, "wb") as file:
+        file.write(header + level + capture(simulation))
+
+def read_save(path):
+    """
+    Function for reading a file written by write_save, returns (seed, width, height, level, snapshot)
+
+    Parameters:
+    path: str
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < SAVE_HEADER.size:
+        raise ValueError(f"{path} is not a Breakout save file")
+    magic, version, seed, width, height, level_length = SAVE_HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a Breakout save file")
+    offset = SAVE_HEADER.size
+    level = data[offset:offset + level_length].decode() if level_length else None
+    snapshot = data[offset + level_length:]
+
+    # The snapshot is STATE, five float64 arrays of extra balls, then one byte of hit points per block
+    if len(snapshot) < STATE.size:
+        raise ValueError(f"{path} is truncated")
+    extra_balls, block_entries = STATE.unpack_from(snapshot)[-2:]
+    if len(snapshot) != STATE.size + 40 * extra_balls + block_entries:
+        raise ValueError(f"{path} is the wrong length for a snapshot of {block_entries} blocks")
+    return seed, width, height, level, snapshot
+
+def load_save(path, time_step=1):
+    """
+    Function for rebuilding the game saved in a file, returns (simulation, seed)
+
+    Parameters:
+    path: str
+    time_step: float
+    """
+    seed, width, height, level, snapshot = read_save(path)
+    simulation = BreakoutSimulation(width, height, time_step=time_step, rng=Random(seed), level=level)
+    restore(simulation, snapshot)
+    return simulation, seed
+
+class RewindBuffer:
+    """
+    Class for the last capacity ticks of a game, one snapshot per tick in a fixed-size ring
+
+    Each slot holds the packed STATE in one preallocated bytearray, plus the extra balls and the blocks whose hit
+    points changed during the tick as (index, before, after). A tick that hit no blocks stores no block data, and
+    stepping back undoes the newest tick's block changes then restores the snapshot before it, so no tick ever
+    needs the whole board. The oldest snapshot is overwritten once the ring is full
+
+    Parameters:
+    capacity: int, ticks kept
+    """
+    __slots__ = ("capacity", "states", "extras", "newest", "count", "hit_points")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.states = bytearray(capacity * STATE.size)
+        self.extras = [b""] * capacity
+        self.newest = -1
+        self.count = 0
+        self.hit_points = bytearray()
+
+    def __len__(self):
+        return self.count
+
+    def clear(self, simulation):
+        """
+        Method for dropping every snapshot and starting again from the game's current state
+
+        Parameters:
+        simulation: BreakoutSimulation
+        """
+        self.count = 0
+        self.hit_points = bytearray(simulation.block_grid.hit_points)
+        self.push(simulation)
+
+    def push(self, simulation):
+        """
+        Method for adding a snapshot of the game after a tick
+
+        Parameters:
+        simulation: BreakoutSimulation
+        """
+        hit_points = simulation.block_grid.hit_points
+        changes = b""
+        changed = 0
+        if hit_points != self.hit_points:
+            after = np.frombuffer(hit_points, dtype=np.uint8)
+            before = np.frombuffer(self.hit_points, dtype=np.uint8)
+            indices = np.flatnonzero(after != before)
+            changed = len(indices)
+            changes = indices.astype("<u4").tobytes() + before[indices].tobytes() + after[indices].tobytes()
+            self.hit_points[:] = hit_points
+        count, balls = pack_balls(simulation)
+
+        self.newest = (self.newest + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        STATE.pack_into(self.states, self.newest * STATE.size, *state_values(simulation, count, changed))
+        self.extras[self.newest] = balls + changes if changes else balls
+
+    def pop(self, simulation):
+        """
+        Method for stepping the game back one tick, returns False once only the oldest snapshot is left
+
+        Parameters:
+        simulation: BreakoutSimulation
+        """
+        if self.count < 2:
+            return False
+        newest = self.newest
+        extra_balls, changed = STATE.unpack_from(self.states, newest * STATE.size)[-2:]
+        if changed:
+            # Block changes follow the five float64 arrays of extra balls
+            changes, offset = self.extras[newest], 40 * extra_balls
+            indices = np.frombuffer(changes, dtype="<u4", count=changed, offset=offset)
+            before = np.frombuffer(changes, dtype=np.uint8, count=changed, offset=offset + 4 * changed)
+            hit_points = np.frombuffer(self.hit_points, dtype=np.uint8)
+            hit_points[indices] = before
+            set_hit_points(simulation.block_grid, self.hit_points)
+        self.extras[newest] = b""
+        self.newest = newest = (newest - 1) % self.capacity
+        self.count -= 1
+
+        # The snapshot before holds everything but the blocks, which are now back how they were after its tick
+        extra_balls, _ = restore_state(simulation, self.states, newest * STATE.size)
+        restore_balls(simulation, extra_balls, self.extras[newest])
+        return True
@@ -0,0 +1,208 @@
+import argparse
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from Bot import PredictiveBot
+from Simulation import BreakoutSimulation
+
+# Longest a round may last, so two players who never miss can not stall the tournament
+MAX_TICKS = 20000
+
+# Starting rating and largest change per game for the Elo ranking
+START_RATING = 1500
+K_FACTOR = 32
+
+def follow_ball(simulation):
+    """
+    Controller that keeps the middle of the paddle under the ball
+
+    Parameters:
+    simulation: BreakoutSimulation
+    """
+    paddle_center = simulation.paddle.x + simulation.paddle.width / 2
+    if simulation.ball.x < paddle_center - 10:
+        return "left"
+    if simulation.ball.x > paddle_center + 10:
+        return "right"
+    return None
+
+def lazy_follow(simulation):
+    """
+    Controller that only chases the ball once it is falling in the bottom half of the screen
+
+    Parameters:
+    simulation: BreakoutSimulation
+    """
+    if simulation.ball.dy < 0 or simulation.ball.y < simulation.height / 2:
+        return None
+    return follow_ball(simulation)
+
+def sweep(simulation):
+    """
+    Scripted controller that drives the paddle from wall to wall and back
+
+    Parameters:
+    simulation: BreakoutSimulation
+    """
+    if simulation.paddle.x <= 0:
+        return "right"
+    if simulation.paddle.x + simulation.paddle.width >= simulation.width:
+        return "left"
+    return simulation.paddle_moving_direction or "right"
+
+def still(simulation):
+    """
+    Controller that never moves the paddle
+
+    Parameters:
+    simulation: BreakoutSimulation
+    """
+    return None
+
+# Controllers by name, names are what gets sent to worker processes. Use make_controller to get one
+CONTROLLERS = {
+    "follow": follow_ball,
+    "lazy": lazy_follow,
+    "sweep": sweep,
+    "still": still,
+    "predict": PredictiveBot,  # A class, so every game gets its own bot and cache
+}
+
+def make_controller(name):
+    """
+    Function for a controller ready to drive one game, controllers registered as a class get a fresh instance
+
+    Parameters:
+    name: str
+    """
+    control = CONTROLLERS[name]
+    return control() if isinstance(control, type) else control
+
+def play_round(controller, seed, modifier=None):
+    """
+    Function for one player's round: a fresh board played until the ball is lost, every block is gone,
+    or MAX_TICKS runs out. Returns the number of blocks destroyed
+
+    Parameters:
+    controller: str
+    seed: int
+    modifier: str
+    """
+    control = make_controller(controller)
+    simulation = BreakoutSimulation(modifier=modifier, rng=Random(seed))
+    for _ in range(MAX_TICKS):
+        simulation.step(control(simulation))
+        if simulation.game_over:
+            break
+    return simulation.P1_score
+
+def play_match(match):
+    """
+    Function for a two-player match with the rules of Old_Breakout.BreakoutMinigame: each player plays one round on
+    the same seeded board, the higher score wins and a tie is decided at random. Returns the match with the
+    scores and the winning player, 1 or 2, added
+
+    Parameters:
+    match: (str, str, int, str) of player 1, player 2, seed and modifier
+    """
+    player1, player2, seed, modifier = match
+    scores = [play_round(player1, seed, modifier), play_round(player2, seed, modifier)]
+    score_difference = scores[0] - scores[1]
+    if score_difference > 0:
+        player_win = 1
+    elif score_difference < 0:
+        player_win = 2
+    else:
+        player_win = Random(seed).randrange(1, 3)
+    return player1, player2, seed, modifier, scores[0], scores[1], player_win
+
+def schedule(controllers, games, seed=0, modifier=None):
+    """
+    Function for listing every pairing of the controllers, with each pairing played games times on different seeds
+    and the players swapping sides each game
+
+    Parameters:
+    controllers: list of str
+    games: int
+    seed: int
+    modifier: str
+    """
+    rng = Random(seed)
+    matches = []
+    for player1, player2 in itertools.combinations(controllers, 2):
+        for game in range(games):
+            players = (player1, player2) if game % 2 == 0 else (player2, player1)
+            matches.append((*players, rng.randrange(2 ** 63), modifier))
+    return matches
+
+def run_tournament(matches, workers=None):
+    """
+    Function for playing the matches across a pool of worker processes, returns the results in schedule order
+
+    Parameters:
+    matches: list of matches from schedule
+    workers: int, one per CPU core if not given
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [play_match(match) for match in matches]
+    chunksize = max(1, len(matches) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(play_match, matches, chunksize=chunksize))
+
+def elo_ratings(results):
+    """
+    Function for rating every controller by replaying the results in order through the Elo formula
+
+    Parameters:
+    results: list of results from play_match
+    """
+    ratings = {}
+    for player1, player2, _, _, _, _, player_win in results:
+        rating1 = ratings.setdefault(player1, START_RATING)
+        rating2 = ratings.setdefault(player2, START_RATING)
+        expected1 = 1 / (1 + 10 ** ((rating2 - rating1) / 400))
+        actual1 = 1.0 if player_win == 1 else 0.0
+        ratings[player1] = rating1 + K_FACTOR * (actual1 - expected1)
+        ratings[player2] = rating2 - K_FACTOR * (actual1 - expected1)
+    return ratings
+
+def write_results(path, results):
+    """
+    Function for writing one CSV row per match
+
+    Parameters:
+    path: str
+    results: list of results from play_match
+    """
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["player1", "player2", "seed", "modifier", "score1", "score2", "winner"])
+        writer.writerows(results)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Headless two-player Breakout tournament")
+    parser.add_argument("--controllers", nargs="+", default=list(CONTROLLERS), choices=list(CONTROLLERS))
+    parser.add_argument("--games", type=int, default=10, help="games per pairing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--modifier", choices=["speed", "multiball"])
+    parser.add_argument("--workers", type=int, help="worker processes, one per CPU core by default")
+    parser.add_argument("--out", metavar="PATH", help="write the results table as CSV")
+    args = parser.parse_args()
+
+    matches = schedule(args.controllers, args.games, args.seed, args.modifier)
+    start = time.perf_counter()
+    results = run_tournament(matches, args.workers)
+    elapsed = time.perf_counter() - start
+    if args.out:
+        write_results(args.out, results)
+
+    wins = {controller: 0 for controller in args.controllers}
+    for player1, player2, _, _, _, _, player_win in results:
+        wins[player1 if player_win == 1 else player2] += 1
+    print(f"{len(results)} games in {elapsed:.2f}s, {len(results) / elapsed:.1f} games/s")
+    for rank, (controller, rating) in enumerate(sorted(elo_ratings(results).items(), key=lambda item: -item[1]), 1):
+        print(f"{rank}. {controller:<10} {rating:7.1f}  {wins[controller]} wins")
@@ -0,0 +1,53 @@
+"""
+Benchmark of game ticks per second for BatchSimulation at several batch sizes against the scalar BreakoutSimulation
+
+Run from the repository root with: python -m benchmarks.bench_batch
+"""
+import time
+import numpy as np
+from Simulation import BreakoutSimulation
+from BatchSimulation import BatchSimulation
+
+TICKS = 500
+BATCH_SIZES = [1, 16, 256, 4096, 16384]
+
+def scalar_ticks_per_second(n_games):
+    """
+    Time n_games scalar simulations stepped one after the other with a ball-following paddle
+    """
+    simulations = [BreakoutSimulation() for _ in range(n_games)]
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        for simulation in simulations:
+            paddle_center = simulation.paddle.x + simulation.paddle.width / 2
+            if simulation.ball.x < paddle_center - 10:
+                direction = "left"
+            elif simulation.ball.x > paddle_center + 10:
+                direction = "right"
+            else:
+                direction = None
+            simulation.step(direction)
+            if simulation.game_over:
+                simulation.reset()
+    return n_games * TICKS / (time.perf_counter() - start)
+
+def batch_ticks_per_second(n_games):
+    """
+    Time one BatchSimulation of n_games with the same ball-following paddle
+    """
+    batch = BatchSimulation(n_games, seed=0)
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        paddle_center = batch.paddle_x + batch.paddle_width / 2
+        actions = np.where(batch.ball_x < paddle_center - 10, -1, np.where(batch.ball_x > paddle_center + 10, 1, 0))
+        batch.step(actions)
+        if batch.game_over.any():
+            batch.reset(batch.game_over)
+    return n_games * TICKS / (time.perf_counter() - start)
+
+if __name__ == '__main__':
+    scalar = scalar_ticks_per_second(64)
+    print(f"{'scalar':>10} {scalar:>14,.0f} ticks/s")
+    for n_games in BATCH_SIZES:
+        batched = batch_ticks_per_second(n_games)
+        print(f"{n_games:>10} {batched:>14,.0f} ticks/s  ({batched / scalar:.1f}x scalar)")
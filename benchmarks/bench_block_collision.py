@@ -0,0 +1,77 @@
+"""
+Micro-benchmark of block collision lookups, comparing the BlockGrid cell index against
+the old pygame.Rect.collidelist scan with list.pop removal
+
+Run from the repository root with: python -m benchmarks.bench_block_collision
+"""
+import random
+import time
+import pygame
+from Simulation import HEIGHT, WIDTH, BlockGrid
+
+QUERIES = 20000
+RADIUS = 10
+
+def make_blocks(columns, rows, width, height, gap):
+    """
+    Build a lattice of blocks and colors covering the top of the screen
+    """
+    blocks = [(10 + (width + gap) * i, 10 + (height + gap) * j, width, height) for i in range(columns) for j in range(rows)]
+    colors = [(255, 255, 255)] * len(blocks)
+    return blocks, colors
+
+LAYOUTS = {
+    40: (10, 4, 100, 50, 20),
+    1000: (50, 20, 20, 10, 4),
+    10000: (100, 100, 10, 5, 2),
+}
+
+def ball_positions(seed=0):
+    """
+    Random whole-pixel ball centers spread over the screen, so most lookups miss like they do in play
+    """
+    rng = random.Random(seed)
+    return [(rng.randrange(WIDTH), rng.randrange(HEIGHT)) for _ in range(QUERIES)]
+
+def time_collidelist(blocks, colors, positions):
+    """
+    The old path: collidelist over a list of Rects, popping hits from both lists
+    """
+    block_list = [pygame.Rect(block) for block in blocks]
+    color_list = list(colors)
+    ball = pygame.Rect(0, 0, RADIUS * 2, RADIUS * 2)
+    hits = 0
+    start = time.perf_counter()
+    for x, y in positions:
+        ball.center = (x, y)
+        hit_index = ball.collidelist(block_list)
+        if hit_index != -1:
+            block_list.pop(hit_index)
+            color_list.pop(hit_index)
+            hits += 1
+    return time.perf_counter() - start, hits
+
+def time_block_grid(blocks, colors, positions):
+    """
+    The new path: BlockGrid.collide over the cells the ball overlaps, with O(1) removal
+    """
+    grid = BlockGrid()
+    grid.set_blocks(blocks, colors)
+    hits = 0
+    start = time.perf_counter()
+    for x, y in positions:
+        hit_index = grid.collide(x - RADIUS, y - RADIUS, x + RADIUS, y + RADIUS)
+        if hit_index != -1:
+            grid.pop(hit_index)
+            hits += 1
+    return time.perf_counter() - start, hits
+
+if __name__ == '__main__':
+    print(f"{'blocks':>8} {'collidelist':>14} {'BlockGrid':>14} {'speedup':>8}")
+    for count, layout in LAYOUTS.items():
+        blocks, colors = make_blocks(*layout)
+        positions = ball_positions()
+        old_time, old_hits = time_collidelist(blocks, colors, positions)
+        new_time, new_hits = time_block_grid(blocks, colors, positions)
+        assert old_hits == new_hits, "both paths should destroy the same number of blocks"
+        print(f"{len(blocks):>8} {QUERIES / old_time:>12,.0f}/s {QUERIES / new_time:>12,.0f}/s {old_time / new_time:>7.1f}x")
@@ -0,0 +1,92 @@
+"""
+Benchmark of the predictive bot against the other controllers: the cost of one call, headless ticks per second
+with the bot driving the paddle, and how often it has to project the ball's path again. Then whole games per
+second with BatchPredictiveBot driving BatchSimulation batches of several sizes
+
+Run from the repository root with: python -m benchmarks.bench_bot
+"""
+import time
+from random import Random
+import numpy as np
+from BatchSimulation import BatchPredictiveBot, BatchSimulation
+from Simulation import BreakoutSimulation
+from Tournament import make_controller
+
+CALLS = 200000
+GAMES = 10
+MAX_TICKS = 20000
+BATCH_SIZES = [1024, 4096, 16384, 65536]
+BATCH_TICKS = 10000  # About one batched game, as the ball moves a fixed 5 pixels per tick
+
+def call_time(control):
+    """
+    Time calling a controller on a game in play, returns nanoseconds per call
+    """
+    simulation = BreakoutSimulation(rng=Random(0))
+    for _ in range(100):
+        simulation.step(control(simulation))
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        control(simulation)
+    return (time.perf_counter() - start) * 1e9 / CALLS
+
+def play(control):
+    """
+    Play GAMES seeded games with a controller, returns (ticks per second, average blocks destroyed)
+    """
+    ticks = score = 0
+    start = time.perf_counter()
+    for seed in range(GAMES):
+        simulation = BreakoutSimulation(rng=Random(seed))
+        for _ in range(MAX_TICKS):
+            simulation.handle_input(control(simulation))
+            simulation.handle_collisions()
+            ticks += 1
+            if simulation.game_over:
+                break
+        score += simulation.P1_score
+    return ticks / (time.perf_counter() - start), score / GAMES
+
+def batch_games(n_games):
+    """
+    Play n_games batched games, starting a new game wherever one ends or reaches MAX_TICKS, for BATCH_TICKS ticks
+    untimed so the games are at every stage, then BATCH_TICKS timed ticks, returns (games finished per second,
+    game ticks per second, average blocks destroyed per finished game)
+    """
+    batch = BatchSimulation(n_games, seed=0)
+    bot = BatchPredictiveBot(batch)
+    started = np.zeros(n_games, dtype=np.int64)
+    finished = score = 0
+    for tick in range(2 * BATCH_TICKS):
+        if tick == BATCH_TICKS:
+            finished = score = 0
+            start = time.perf_counter()
+        batch.step(bot())
+        over = batch.game_over | (started <= tick + 1 - MAX_TICKS)
+        if over.any():
+            finished += int(over.sum())
+            score += int(batch.score[over].sum())
+            batch.reset(over)
+            started[over] = tick + 1
+    elapsed = time.perf_counter() - start
+    return finished / elapsed, n_games * BATCH_TICKS / elapsed, score / max(1, finished)
+
+if __name__ == '__main__':
+    print(f"{'controller':<10} {'call':>10} {'ticks/s':>10} {'blocks':>7}")
+    for name in ("follow", "predict"):
+        control = make_controller(name)
+        per_call = call_time(control)
+        rate, score = play(control)
+        print(f"{name:<10} {per_call:>8.0f}ns {rate:>10.0f} {score:>7.1f}")
+    bot = make_controller("predict")
+    simulation = BreakoutSimulation(rng=Random(0))
+    for tick in range(1, MAX_TICKS + 1):
+        simulation.step(bot(simulation))
+        if simulation.game_over:
+            break
+    print(f"predict projected the ball's path {bot.predictions} times in {tick} ticks")
+
+    print(f"{'batch':>7} {'games/s':>10} {'ticks/s':>10} {'blocks':>7}")
+    for n_games in BATCH_SIZES:
+        rate, ticks, score = batch_games(n_games)
+        print(f"{n_games:>7} {rate:>10.0f} {ticks:>10.0f} {score:>7.1f}")
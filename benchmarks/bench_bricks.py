@@ -0,0 +1,44 @@
+"""
+Benchmark of BlockGrid.draw from the brick atlas against one pygame.draw.rect call per block, for boards
+of 40 up to 8000 blocks covering the same area of the screen, in every brick style
+
+Uses the SDL dummy video driver so it runs headless. Run from the repository root with:
+python -m benchmarks.bench_bricks
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import time
+import pygame
+import Assets
+from Breakout import BlockGrid, HEIGHT, WIDTH
+from benchmarks.bench_suite import layout
+
+DRAWS = 200
+BLOCK_COUNTS = [40, 400, 2000, 8000]
+
+def time_draw(draw):
+    """
+    Call draw DRAWS times after one warm-up call, returns milliseconds per call
+    """
+    draw()
+    start = time.perf_counter()
+    for _ in range(DRAWS):
+        draw()
+    return (time.perf_counter() - start) * 1000 / DRAWS
+
+if __name__ == '__main__':
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    print(f"{'blocks':>7} {'draw.rect':>11}" + "".join(f" {style:>10}" for style in Assets.BRICK_STYLES))
+    for count in BLOCK_COUNTS:
+        block_grid = BlockGrid()
+        block_grid.set_blocks(*layout(count))
+        per_rect = time_draw(lambda: [pygame.draw.rect(screen, color, block) for block, color in
+                                      zip(block_grid.blocks, block_grid.colors)])
+        row = f"{count:>7} {per_rect:>9.3f}ms"
+        for style in Assets.BRICK_STYLES:
+            block_grid.atlas = Assets.cache.brick_atlas(style)
+            row += f" {time_draw(lambda: block_grid.draw(screen)):>8.3f}ms"
+        print(row)
+    pygame.quit()
@@ -0,0 +1,53 @@
+"""
+Benchmark of the reinforcement learning environment, comparing steps per second for each observation type
+with copying a full-size screen out through pygame.surfarray, scaling it and stacking the copies every step
+
+Run from the repository root with:
+python -m benchmarks.bench_env
+"""
+import time
+from collections import deque
+import numpy as np
+import pygame
+from Environment import ACTIONS, BreakoutEnv
+
+STEPS = 3000
+
+def run(env):
+    """
+    Step the environment with a fixed action pattern, returns steps per second
+    """
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for step in range(STEPS):
+        _, _, terminated, truncated, _ = env.step(step % len(ACTIONS))
+        if terminated or truncated:
+            env.reset()
+    return STEPS / (time.perf_counter() - start)
+
+def run_copying(downscale, frame_stack):
+    """
+    Step a state environment while drawing every frame at full size and copying it into a new stacked array,
+    the way observations are built without the shared frame ring. Returns steps per second
+    """
+    env = BreakoutEnv("pixels", frame_stack=1)
+    size = (env.simulation.width // downscale, env.simulation.height // downscale)
+    stack = deque(maxlen=frame_stack)
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for step in range(STEPS):
+        _, _, terminated, truncated, _ = env.step(step % len(ACTIONS))
+        frame = pygame.surfarray.array3d(pygame.transform.scale(env.surfaces[0], size))
+        stack.append(frame)
+        np.stack(stack)
+        if terminated or truncated:
+            env.reset()
+    return STEPS / (time.perf_counter() - start)
+
+if __name__ == '__main__':
+    print(f"{'observation':<32} {'steps/s':>10}")
+    print(f"{'state vector':<32} {run(BreakoutEnv('state')):>10.0f}")
+    for downscale, frame_stack in ((1, 1), (4, 4)):
+        label = f"pixels 1/{downscale}, stack {frame_stack}"
+        print(f"{label:<32} {run(BreakoutEnv('pixels', downscale, frame_stack)):>10.0f}")
+        print(f"{label + ' (copying)':<32} {run_copying(downscale, frame_stack):>10.0f}")
@@ -0,0 +1,60 @@
+"""
+Benchmark of the CPU the game uses while it waits for the player, on the modifier screen and the end screen,
+against the pygame.event.get polling loop the modifier screen used before
+
+CPU use is process time over wall time, so 100% is one core kept busy. Uses the SDL dummy video driver
+so it runs headless. Run from the repository root with:
+python -m benchmarks.bench_idle
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import time
+import pygame
+from Breakout import BreakoutGame, HEIGHT, WIDTH
+from Scenes import END_SCREEN_TIME, EndScene
+
+WAIT = 2000
+
+def cpu_use(wait):
+    """
+    Call wait and time it, returns (wall seconds, CPU use as a fraction of one core)
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    wait()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return wall, cpu / wall
+
+def press_later(key):
+    """
+    Queue a key press to arrive after WAIT milliseconds
+    """
+    pygame.time.set_timer(pygame.event.Event(pygame.KEYDOWN, key=key), WAIT, loops=1)
+
+def polling_menu():
+    """
+    Wait for the key press the way the modifier screen used to, polling the event queue in a tight loop
+    """
+    chosen = False
+    while not chosen:
+        for event in pygame.event.get():
+            if event.type == pygame.KEYDOWN:
+                chosen = True
+
+if __name__ == '__main__':
+    pygame.display.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    press_later(pygame.K_2)
+    results = [("modifier screen, polling", *cpu_use(polling_menu))]
+
+    games = []
+    press_later(pygame.K_2)
+    results.append(("modifier screen, scene", *cpu_use(lambda: games.append(BreakoutGame(WIDTH, HEIGHT, seed=0)))))
+    game = games[0]
+    results.append(("end screen, scene", *cpu_use(lambda: game.scenes.run(EndScene(game)))))
+
+    print(f"{'':<26} {'wall':>8} {'cpu':>7}")
+    for name, wall, use in results:
+        print(f"{name:<26} {wall:>7.2f}s {use:>7.1%}")
+    print(f"end screen shown for {END_SCREEN_TIME:.1f}s unless a key is pressed")
+    pygame.quit()
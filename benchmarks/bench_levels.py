@@ -0,0 +1,62 @@
+"""
+Startup-time benchmark for a 100k-brick level, comparing building pygame.Rect lists in Python the way
+createGrid does against loading text and memory-mapped binary levels into BlockGrid
+
+Run from the repository root with: python -m benchmarks.bench_levels
+"""
+import os
+import tempfile
+import time
+from random import Random
+import pygame
+from Levels import load_level, save_binary, save_text
+from Simulation import BlockGrid, BreakoutSimulation
+
+COLUMNS = 400
+ROWS = 250
+
+def rect_lists():
+    """
+    Build the same bricks as pygame.Rect and color lists, like the original createGrid did for 40 blocks
+    """
+    rng = Random(0)
+    block_list = [pygame.Rect(3 * i, 3 * j, 2, 2) for i in range(COLUMNS) for j in range(ROWS)]
+    color_list = [(rng.randrange(30, 256), rng.randrange(30, 256), rng.randrange(30, 256)) for _ in range(len(block_list))]
+    return block_list, color_list
+
+def timed(function, *args):
+    """
+    Run function once and return how long it took in milliseconds
+    """
+    start = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - start) * 1000
+
+if __name__ == '__main__':
+    rng = Random(0)
+    source = BlockGrid()
+    blocks = [(3 * i, 3 * j, 2, 2) for i in range(COLUMNS) for j in range(ROWS)]
+    colors = [(rng.randrange(30, 256), rng.randrange(30, 256), rng.randrange(30, 256)) for _ in blocks]
+    source.set_blocks(blocks, colors)
+
+    with tempfile.TemporaryDirectory() as directory:
+        text_path = os.path.join(directory, "level.txt")
+        binary_path = os.path.join(directory, "level.lvl")
+        save_text(text_path, source)
+        save_binary(binary_path, source)
+
+        text_grid, binary_grid = BlockGrid(), BlockGrid()
+        results = {
+            "pygame.Rect lists": timed(rect_lists),
+            "text level": timed(load_level, text_path, text_grid),
+            "binary level (mmap)": timed(load_level, binary_path, binary_grid),
+        }
+        assert list(binary_grid.blocks) == list(text_grid.blocks) == blocks, "all formats should hold the same bricks"
+        assert binary_grid.collide(0, 0, 4, 4) == text_grid.collide(0, 0, 4, 4) == source.collide(0, 0, 4, 4)
+
+        # A whole game set up on the mapped level, ready for its first tick
+        results["BreakoutSimulation(level=...)"] = timed(BreakoutSimulation, 1200, 800, None, 1, Random(0), binary_path)
+
+        print(f"{len(blocks):,} bricks")
+        for name, milliseconds in results.items():
+            print(f"{name:>28} {milliseconds:>10.2f} ms")
@@ -0,0 +1,58 @@
+"""
+Stress benchmark of multi-ball play, timing physics and dirty-rectangle drawing with 8, 64 and 512 balls
+
+Uses the SDL dummy video driver so it runs headless. Run from the repository root with:
+python -m benchmarks.bench_multiball
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import time
+import pygame
+from Breakout import BreakoutGame, HEIGHT, PHYSICS_RATE, RENDER_FPS, WIDTH
+
+FRAMES = 300
+TICKS_PER_FRAME = PHYSICS_RATE // RENDER_FPS
+
+def make_game():
+    """
+    Create a multi-ball game, answering the modifier screen with a queued key press
+    """
+    pygame.init()
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_3))
+    return BreakoutGame(WIDTH, HEIGHT, seed=0)
+
+def time_balls(game, splits):
+    """
+    Split the ball the given number of times and time whole frames, returns (physics ms, draw ms, average balls)
+    """
+    game.reset("multiball")
+    for _ in range(splits):
+        game.split_balls()
+    physics = draw = 0.0
+    balls = 0
+    for _ in range(FRAMES):
+        paddle_center = game.paddle.x + game.paddle.width / 2
+        direction = "left" if game.ball.x < paddle_center - 10 else "right" if game.ball.x > paddle_center + 10 else None
+        start = time.perf_counter()
+        for _ in range(TICKS_PER_FRAME):
+            game.save_positions()
+            game.handle_input(direction)
+            game.handle_collisions()
+        middle = time.perf_counter()
+        game.update_screen()
+        physics += middle - start
+        draw += time.perf_counter() - middle
+        balls += 1 + (game.balls.count if game.balls is not None else 0)
+        if game.game_over:
+            break
+    return physics * 1000 / FRAMES, draw * 1000 / FRAMES, balls / FRAMES
+
+if __name__ == '__main__':
+    game = make_game()
+    budget = 1000 / RENDER_FPS
+    print(f"{'split to':>9} {'avg balls':>10} {'physics':>10} {'draw':>10} {'frame':>10}  budget {budget:.1f} ms")
+    for splits, label in ((1, 8), (2, 64), (3, 512)):
+        physics, draw, balls = time_balls(game, splits)
+        print(f"{label:>9} {balls:>10.0f} {physics:>8.2f}ms {draw:>8.2f}ms {physics + draw:>8.2f}ms")
+    pygame.quit()
@@ -0,0 +1,60 @@
+"""
+Benchmark of the networked server, timing ticks of many rooms with snapshots sent over localhost UDP
+and working out how many rooms one core can host at the server's tick rate
+
+Clients are stood in for by feeding every player its controller's input and acknowledging the previous
+snapshot each tick, so the time measured is the server's alone. Run from the repository root with:
+python -m benchmarks.bench_network
+"""
+import asyncio
+import socket
+import time
+from Network import JOIN, JOIN_MESSAGE, SEATS, TICK_RATE, GameServer
+from Tournament import CONTROLLERS
+
+TICKS = 300
+
+async def time_rooms(rooms):
+    """
+    Fill a server with the given number of rooms and time its ticks, returns milliseconds per tick
+    """
+    loop = asyncio.get_running_loop()
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    sink.setblocking(False)
+    transport, server = await loop.create_datagram_endpoint(lambda: GameServer(0), local_addr=("127.0.0.1", 0))
+    # Join under made-up addresses so every seat is a different player, then send all snapshots to the sink
+    for room_id in range(rooms):
+        for seat in range(SEATS):
+            server.datagram_received(JOIN_MESSAGE.pack(JOIN, room_id, 0), ("127.0.0.1", 1 + SEATS * room_id + seat))
+    for room in server.rooms.values():
+        for player in room.players:
+            player.address = sink.getsockname()
+
+    control = CONTROLLERS["follow"]
+    elapsed = 0.0
+    for _ in range(TICKS):
+        for room in server.rooms.values():
+            for player in room.players:
+                player.sequence += 1
+                player.inputs.append((player.sequence, control(player.simulation)))
+                player.acknowledged_tick = room.tick_count
+                player.heard = time.monotonic()
+        start = time.perf_counter()
+        server.tick()
+        elapsed += time.perf_counter() - start
+        try:
+            while sink.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+    transport.close()
+    sink.close()
+    return elapsed * 1000 / TICKS
+
+if __name__ == '__main__':
+    budget = 1000 / TICK_RATE
+    print(f"{'rooms':>6} {'ms/tick':>10} {'rooms per core':>16}  budget {budget:.1f} ms at {TICK_RATE} Hz")
+    for rooms in (1, 10, 100, 400):
+        per_tick = asyncio.run(time_rooms(rooms))
+        print(f"{rooms:>6} {per_tick:>10.3f} {rooms * budget / per_tick:>16.0f}")
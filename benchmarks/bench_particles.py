@@ -0,0 +1,62 @@
+"""
+Stress benchmark of the particle pool, timing one physics tick and one draw with up to 30000 live particles,
+then showing the quality drop when frames keep running over a tight budget
+
+Uses the SDL dummy video driver so it runs headless. Run from the repository root with:
+python -m benchmarks.bench_particles
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import time
+import pygame
+from Breakout import HEIGHT, RENDER_FPS, WIDTH
+from Particles import BURST, ParticlePool
+
+FRAMES = 200
+
+def fill(pool, screen, count):
+    """
+    Burst particles out of rects across the top of the screen until count are alive
+    """
+    pool.clear()
+    block = 0
+    while pool.count < count:
+        rect = pygame.Rect(10 + 120 * (block % 10), 10 + 70 * (block // 10 % 4), 100, 50)
+        pool.burst(rect, screen.map_rgb((255, 200, 80)))
+        block += 1
+    pool.life[:pool.count] = 1e9  # Keep every particle alive for the whole run
+
+def time_frames(pool, screen, count):
+    """
+    Time ticking and drawing count particles, returns (tick ms, draw ms) per frame
+    """
+    fill(pool, screen, count)
+    tick = draw = 0.0
+    for _ in range(FRAMES):
+        start = time.perf_counter()
+        pool.tick(0.25, WIDTH, 10 * HEIGHT)  # A tall playfield so falling particles stay alive
+        middle = time.perf_counter()
+        pool.draw(screen)
+        tick += middle - start
+        draw += time.perf_counter() - middle
+    return tick * 1000 / FRAMES, draw * 1000 / FRAMES
+
+if __name__ == '__main__':
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pool = ParticlePool(seed=0)
+    budget = 1000 / RENDER_FPS
+    print(f"{'particles':>10} {'tick':>10} {'draw':>10}  budget {budget:.1f} ms")
+    for count in (1000, 10000, 30000):
+        tick, draw = time_frames(pool, screen, count)
+        print(f"{count:>10} {tick:>8.3f}ms {draw:>8.3f}ms")
+
+    # Frames that always take twice a 1 ms budget, with a block destroyed every frame
+    pool.clear()
+    for frame in range(12):
+        pool.burst(pygame.Rect(500, 100, 100, 50), screen.map_rgb((255, 200, 80)))
+        pool.adapt(0.002, 0.001)
+        print(f"over budget frame {frame + 1:>2}: quality {pool.quality:.2f}, burst {round(BURST * pool.quality)}, "
+              f"{pool.count} alive")
+    pygame.quit()
@@ -0,0 +1,52 @@
+"""
+Frame-time comparison between full-frame redraws and dirty-rectangle rendering in BreakoutGame
+
+Uses the SDL dummy video driver so it runs headless. Run from the repository root with:
+python -m benchmarks.bench_rendering
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import time
+import pygame
+from Breakout import BreakoutGame, HEIGHT, WIDTH
+
+FRAMES = 2000
+
+def make_game(dirty_rendering):
+    """
+    Create a game, answering the modifier screen with a queued key press
+    """
+    pygame.init()
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_1))
+    return BreakoutGame(WIDTH, HEIGHT, dirty_rendering=dirty_rendering, seed=0)
+
+def time_frames(game):
+    """
+    Step the game with a ball-following paddle and time update_screen alone, returns milliseconds per frame
+    """
+    elapsed = 0.0
+    for _ in range(FRAMES):
+        paddle_center = game.paddle.x + game.paddle.width / 2
+        if game.ball.x < paddle_center - 10:
+            direction = "left"
+        elif game.ball.x > paddle_center + 10:
+            direction = "right"
+        else:
+            direction = None
+        game.handle_input(direction)
+        game.handle_collisions()
+        start = time.perf_counter()
+        game.update_screen()
+        elapsed += time.perf_counter() - start
+        if game.game_over:
+            game.reset_screen()
+    return elapsed * 1000 / FRAMES, pygame.image.tobytes(game.screen, "RGB")
+
+if __name__ == '__main__':
+    full_time, full_frame = time_frames(make_game(False))
+    dirty_time, dirty_frame = time_frames(make_game(True))
+    assert full_frame == dirty_frame, "both paths should leave the same picture on screen"
+    print(f"full redraw:    {full_time:.3f} ms/frame")
+    print(f"dirty rects:    {dirty_time:.3f} ms/frame  ({full_time / dirty_time:.1f}x faster)")
+    pygame.quit()
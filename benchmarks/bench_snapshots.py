@@ -0,0 +1,106 @@
+"""
+Benchmark of game snapshots: pushing every tick into the rewind buffer, stepping back through it, and full
+captures and restores for save files and search bots, on the built-in grid and a board of 4000 blocks. Checks
+that every rewound tick matches the state it had going forward, and that a recording replays after a rewind
+
+Run from the repository root with: python -m benchmarks.bench_snapshots
+"""
+import time
+from random import Random
+from Simulation import BreakoutSimulation
+from Replay import Recording
+from Snapshots import STATE, RewindBuffer, capture, restore
+from Tournament import follow_ball
+from benchmarks.bench_suite import layout
+
+TICKS = 1200
+CALLS = 20000
+
+def start(count):
+    """
+    Create a seeded game, on the built-in grid if count is None or a board of count blocks otherwise
+    """
+    simulation = BreakoutSimulation(rng=Random(0))
+    if count is not None:
+        simulation.block_grid.set_blocks(*layout(count))
+    return simulation
+
+def play(simulation, rewind, hashes):
+    """
+    Play TICKS ticks with a ball-following paddle, pushing each into rewind and adding its state_hash to hashes,
+    returns microseconds per push
+    """
+    pushing = 0.0
+    for _ in range(TICKS):
+        simulation.step(follow_ball(simulation))
+        hashes.append(simulation.state_hash())
+        begin = time.perf_counter()
+        rewind.push(simulation)
+        pushing += time.perf_counter() - begin
+    return pushing * 1e6 / TICKS
+
+def rewind_all(simulation, rewind, hashes):
+    """
+    Step back through everything in rewind, checking each tick against the hashes play noted on the way forward,
+    returns microseconds per pop
+    """
+    popping = 0.0
+    steps = 0
+    while True:
+        begin = time.perf_counter()
+        stepped = rewind.pop(simulation)
+        popping += time.perf_counter() - begin
+        if not stepped:
+            return popping * 1e6 / steps
+        steps += 1
+        assert simulation.state_hash() == hashes[-1 - steps], "rewinding should give back the state of each tick"
+
+def replays_after_rewind():
+    """
+    Record a game, rewind half of it and drop those ticks' inputs like BreakoutGame.rewind_tick, then play on,
+    returns whether the recording still replays to the state the game finished in
+    """
+    simulation = start(None)
+    recording = Recording(0, None, simulation.time_step, simulation.width, simulation.height)
+    rewind = RewindBuffer(TICKS)
+    rewind.clear(simulation)
+    for _ in range(TICKS):
+        direction = follow_ball(simulation)
+        recording.record(direction)
+        simulation.step(direction)
+        rewind.push(simulation)
+    for _ in range(TICKS // 2):
+        rewind.pop(simulation)
+        del recording.directions[-1]
+    for _ in range(TICKS):
+        direction = follow_ball(simulation)
+        recording.record(direction)
+        simulation.step(direction)
+    recording.finish(simulation)
+    return recording.verify()
+
+def per_call(call):
+    """
+    Call call CALLS times, returns microseconds per call
+    """
+    begin = time.perf_counter()
+    for _ in range(CALLS):
+        call()
+    return (time.perf_counter() - begin) * 1e6 / CALLS
+
+if __name__ == '__main__':
+    print(f"{'board':<12} {'push':>8} {'pop':>8} {'capture':>9} {'restore':>9} {'snapshot':>9} {'ring':>9}")
+    for name, count in (("40 blocks", None), ("4000 blocks", 4000)):
+        simulation = start(count)
+        rewind = RewindBuffer(TICKS)
+        rewind.clear(simulation)
+        hashes = [simulation.state_hash()]
+        push = play(simulation, rewind, hashes)
+        ring = len(rewind.states) + sum(len(extra) for extra in rewind.extras)
+        pop = rewind_all(simulation, rewind, hashes)
+
+        snapshot = capture(simulation)
+        print(f"{name:<12} {push:>6.2f}us {pop:>6.2f}us {per_call(lambda: capture(simulation)):>7.2f}us "
+              f"{per_call(lambda: restore(simulation, snapshot)):>7.2f}us {len(snapshot):>7}B {ring / 1024:>7.1f}KB")
+    assert replays_after_rewind(), "a recording should still replay after part of it is rewound"
+    print(f"STATE is {STATE.size} bytes, the ring keeps {TICKS} ticks")
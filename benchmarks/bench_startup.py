@@ -0,0 +1,64 @@
+"""
+Cold-start benchmark, timing from launching a fresh Python process to the first frame on screen
+
+Compares initializing every pygame subsystem and decoding the background on each launch with initializing
+only the display and font and reading the background from the raw cache, and the headless path to its
+first tick. Uses the SDL dummy video driver so it runs headless. Run from the repository root with:
+python -m benchmarks.bench_startup
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+RUNS = 7
+
+# Run in each fresh process: argv is the launch time, "all" to call pygame.init, and "cache" to use the raw cache
+FIRST_FRAME = """
+import os, sys, time
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+launched = float(sys.argv[1])
+import Assets
+from Assets import pygame
+if sys.argv[2] == "all":
+    pygame.init()
+if sys.argv[3] != "cache":
+    Assets.cache.cache_dir = None
+pygame.display.init()
+pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_2))
+from Breakout import BreakoutGame, HEIGHT, WIDTH
+game = BreakoutGame(WIDTH, HEIGHT, seed=0)
+game.update_screen()
+print(time.time() - launched)
+"""
+
+FIRST_TICK = """
+import sys, time
+launched = float(sys.argv[1])
+from Breakout import BreakoutSimulation
+BreakoutSimulation().step()
+print(time.time() - launched, "pygame.base" in sys.modules)
+"""
+
+def launch(code, *args):
+    """
+    Start a fresh interpreter on the code, returns the seconds it reported and anything else it printed
+    """
+    output = subprocess.run([sys.executable, "-c", code, repr(time.time()), *args], capture_output=True,
+                            text=True, check=True).stdout.split()
+    return float(output[-2 if code is FIRST_TICK else -1]), output[-1]
+
+def median_time(code, *args):
+    """
+    Launch the code RUNS times after one warm-up launch, returns the median time to the first frame in milliseconds
+    """
+    launch(code, *args)
+    return statistics.median(launch(code, *args)[0] for _ in range(RUNS)) * 1000
+
+if __name__ == '__main__':
+    print(f"{'start':<44} {'first frame':>12}")
+    print(f"{'pygame.init, background decoded':<44} {median_time(FIRST_FRAME, 'all', 'decode'):>10.1f}ms")
+    print(f"{'display and font, background decoded':<44} {median_time(FIRST_FRAME, 'needed', 'decode'):>10.1f}ms")
+    print(f"{'display and font, background from cache':<44} {median_time(FIRST_FRAME, 'needed', 'cache'):>10.1f}ms")
+    _, loaded = launch(FIRST_TICK)
+    print(f"{'headless, first tick':<44} {median_time(FIRST_TICK):>10.1f}ms  pygame loaded: {loaded}")
@@ -0,0 +1,224 @@
+"""
+Tracked benchmark suite over the simulation, collision and rendering hot paths, with fixed seeds so runs on
+different commits measure the same work
+
+Measures handle_collisions ticks per second across block counts and ball speeds, BlockGrid.draw and
+update_screen frame times, Ball.update_transparency and a whole headless episode. Each result is the best
+of REPEATS runs, which moves far less between runs than the mean or median. Uses the SDL dummy video driver
+so it runs headless. Run from the repository root with:
+python -m benchmarks.bench_suite --out results.json
+python -m benchmarks.bench_suite --compare baseline.json [results.json] [--threshold 0.1]
+Compare mode runs the suite unless a second file is given, and exits with status 1 if anything regressed
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from random import Random
+import pygame
+from Breakout import BreakoutGame, HEIGHT, WIDTH
+from Simulation import BreakoutSimulation
+from Tournament import follow_ball
+
+SEED = 0
+REPEATS = 5
+TICKS = 3000
+FRAMES = 500
+BLOCK_COUNTS = [40, 400, 4000]
+BALL_SPEEDS = [5, 20]
+
+def layout(count):
+    """
+    Lay count blocks out in rows across the top half of the screen, returns (blocks, colors)
+    """
+    columns = math.ceil(math.sqrt(count * WIDTH / (HEIGHT / 2)))
+    rows = math.ceil(count / columns)
+    width, height = (WIDTH - 20) // columns, (HEIGHT // 2) // rows
+    rng = Random(SEED)
+    blocks = [(10 + width * (i % columns), 10 + height * (i // columns), max(1, width - 2), max(1, height - 2))
+              for i in range(count)]
+    colors = [(rng.randrange(30, 256), rng.randrange(30, 256), rng.randrange(30, 256)) for _ in range(count)]
+    return blocks, colors
+
+def best_of(run, better="lower"):
+    """
+    Call run REPEATS times and return the best of what it returns
+    """
+    results = [run() for _ in range(REPEATS)]
+    return max(results) if better == "higher" else min(results)
+
+def collision_rate(count, speed):
+    """
+    Time handle_collisions alone on a board of count blocks with the ball at the given speed, returns ticks per second
+    """
+    blocks, colors = layout(count)
+
+    def start():
+        simulation = BreakoutSimulation(rng=Random(SEED))
+        simulation.block_grid.set_blocks(blocks, colors)
+        simulation.ball.speed = speed
+        simulation.paddle.speed = max(simulation.paddle_speed, 2 * speed)
+        return simulation
+
+    def run():
+        simulation = start()
+        elapsed = 0.0
+        for _ in range(TICKS):
+            simulation.handle_input(follow_ball(simulation))
+            begin = time.perf_counter()
+            simulation.handle_collisions()
+            elapsed += time.perf_counter() - begin
+            if simulation.game_over:
+                simulation = start()
+        return TICKS / elapsed
+    return best_of(run, "higher")
+
+def make_game(dirty_rendering=True):
+    """
+    Create a game with the invisible modifier, answering the modifier screen with a queued key press
+    """
+    pygame.display.init()
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_1))
+    return BreakoutGame(WIDTH, HEIGHT, dirty_rendering=dirty_rendering, seed=SEED)
+
+def block_draw_time(game, count):
+    """
+    Time drawing a board of count blocks, returns milliseconds per draw
+    """
+    game.block_grid.set_blocks(*layout(count))
+
+    def run():
+        start = time.perf_counter()
+        for _ in range(FRAMES // 5):
+            game.block_grid.draw(game.screen)
+        return (time.perf_counter() - start) * 1000 / (FRAMES // 5)
+    return best_of(run)
+
+def frame_time(game):
+    """
+    Play the seeded game with a ball-following paddle and time update_screen alone, returns milliseconds per frame
+    """
+    def run():
+        game.rng = Random(SEED)
+        game.reset_screen()
+        elapsed = 0.0
+        for _ in range(FRAMES):
+            game.handle_input(follow_ball(game))
+            game.handle_collisions()
+            start = time.perf_counter()
+            game.update_screen()
+            elapsed += time.perf_counter() - start
+            if game.game_over:
+                game.reset_screen()
+        return elapsed * 1000 / FRAMES
+    return best_of(run)
+
+def transparency_time(game):
+    """
+    Time Ball.update_transparency over every score the invisible modifier reaches, returns microseconds per call
+    """
+    def run():
+        start = time.perf_counter()
+        for _ in range(10000):
+            for score in range(14):
+                game.ball.update_transparency(score)
+        return (time.perf_counter() - start) * 1e6 / 140000
+    return best_of(run)
+
+def episode_time():
+    """
+    Play a whole seeded headless game with a ball-following paddle, returns milliseconds
+    """
+    def run():
+        simulation = BreakoutSimulation(rng=Random(SEED))
+        start = time.perf_counter()
+        while not simulation.game_over:
+            simulation.step(follow_ball(simulation))
+        return (time.perf_counter() - start) * 1000
+    return best_of(run)
+
+def run_suite():
+    """
+    Run every benchmark, returns the results keyed by name, each with its value, unit and which way is better
+    """
+    results = {}
+
+    def add(name, value, unit, better):
+        results[name] = {"value": value, "unit": unit, "better": better}
+        print(f"{name:<40} {value:>14.3f} {unit}", file=sys.stderr)
+
+    for count in BLOCK_COUNTS:
+        for speed in BALL_SPEEDS:
+            add(f"handle_collisions/{count}_blocks/speed_{speed}", collision_rate(count, speed), "ticks/s", "higher")
+    game = make_game()
+    add("update_screen/dirty", frame_time(game), "ms", "lower")
+    add("ball/update_transparency", transparency_time(game), "us", "lower")
+    for count in BLOCK_COUNTS:
+        add(f"block_grid_draw/{count}_blocks", block_draw_time(game, count), "ms", "lower")
+    add("update_screen/full", frame_time(make_game(dirty_rendering=False)), "ms", "lower")
+    add("episode/follow_ball", episode_time(), "ms", "lower")
+    return results
+
+def describe():
+    """
+    Describe the machine and commit the suite ran on, so result files can be told apart
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"commit": commit, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "pygame": pygame.version.ver, "machine": platform.machine(), "seed": SEED, "repeats": REPEATS}
+
+def compare(baseline, current, threshold):
+    """
+    Print every result beside its baseline, returns the names of results more than threshold worse
+    """
+    regressions = []
+    print(f"{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in current.items():
+        if name not in baseline:
+            print(f"{name:<40} {'':>12} {result['value']:>12.3f}      new")
+            continue
+        old, new = baseline[name]["value"], result["value"]
+        change = (new - old) / old if old else 0.0
+        worse = -change if result["better"] == "higher" else change
+        flag = "  REGRESSION" if worse > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<40} {old:>12.3f} {new:>12.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Tracked Breakout benchmark suite")
+    parser.add_argument("--out", metavar="PATH", help="write the results as JSON, printed to stdout otherwise")
+    parser.add_argument("--compare", nargs="+", metavar="PATH", help="baseline JSON, then optionally the results to check")
+    parser.add_argument("--threshold", type=float, default=0.1, help="fraction worse than the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as file:
+            baseline = json.load(file)["results"]
+        if len(args.compare) > 1:
+            with open(args.compare[1]) as file:
+                current = json.load(file)["results"]
+        else:
+            current = run_suite()
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+    else:
+        report = {"meta": describe(), "results": run_suite()}
+        if args.out:
+            with open(args.out, "w") as file:
+                json.dump(report, file, indent=2)
+        else:
+            print(json.dumps(report, indent=2))
+    pygame.quit()
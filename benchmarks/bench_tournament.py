@@ -0,0 +1,23 @@
+"""
+Scaling benchmark of the tournament runner, games per second against the number of worker processes
+
+Run from the repository root with: python -m benchmarks.bench_tournament
+"""
+import os
+import time
+from Tournament import CONTROLLERS, run_tournament, schedule
+
+GAMES_PER_PAIRING = 8
+
+if __name__ == '__main__':
+    matches = schedule(list(CONTROLLERS), GAMES_PER_PAIRING)
+    cores = os.cpu_count() or 1
+    workers = sorted({1, *[2 ** power for power in range(1, cores.bit_length())], cores})
+    baseline = None
+    print(f"{len(matches)} games per run on {cores} cores")
+    for count in workers:
+        start = time.perf_counter()
+        run_tournament(matches, count)
+        rate = len(matches) / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"{count:>4} workers {rate:>8.1f} games/s  ({rate / baseline:.2f}x, {rate / baseline / count:.0%} of linear)")